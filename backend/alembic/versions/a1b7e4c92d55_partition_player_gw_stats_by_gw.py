@@ -0,0 +1,147 @@
+"""partition player_gw_stats by gw
+
+Revision ID: a1b7e4c92d55
+Revises: f8c2d6a41e93
+Create Date: 2026-08-30 13:12:44.287615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1b7e4c92d55'
+down_revision: Union[str, Sequence[str], None] = 'f8c2d6a41e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Ten-GW ranges cover a season in four partitions; the DEFAULT partition
+# catches anything unexpected rather than failing the insert.
+PARTITION_RANGES = ((1, 11), (11, 21), (21, 31), (31, 39))
+
+
+def _rename_relations_aside(renamed_table: str) -> None:
+    # Renaming a table does not rename its indexes, and index names share the
+    # per-schema relation namespace, so the replacement table could not reuse
+    # them. Move every index/constraint name of the renamed-aside table out of
+    # the way first (the constraint rename also renames its backing index).
+    op.execute(f"ALTER INDEX player_gw_stats_pkey RENAME TO {renamed_table}_pkey")
+    op.execute(
+        f"ALTER TABLE {renamed_table} RENAME CONSTRAINT "
+        f"uq_player_gw_stats_player_id_gw TO uq_{renamed_table}_player_id_gw"
+    )
+    op.execute(f"ALTER INDEX ix_player_gw_stats_gw RENAME TO ix_{renamed_table}_gw")
+    op.execute(
+        f"ALTER INDEX ix_player_gw_stats_player_id RENAME TO ix_{renamed_table}_player_id"
+    )
+    op.execute(
+        f"ALTER INDEX ix_pgs_player_gw_inc_points RENAME TO ix_{renamed_table}_inc_points"
+    )
+
+
+def upgrade():
+    # Recreate player_gw_stats as a RANGE(gw)-partitioned table. Nearly every
+    # read filters by gw (per-GW ingest upserts, the MAE eval's gw bounds),
+    # so partition pruning keeps scans to ~1/4 of the rows. Postgres requires
+    # the partition key in the PK and in unique constraints, hence the
+    # composite (id, gw) PK; id stays identity-generated and unique in
+    # practice via the sequence.
+    op.execute("ALTER TABLE player_gw_stats RENAME TO player_gw_stats_old")
+    _rename_relations_aside("player_gw_stats_old")
+    op.execute(
+        """
+        CREATE TABLE player_gw_stats (
+            id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+            player_id INTEGER NOT NULL REFERENCES players (id),
+            gw INTEGER NOT NULL,
+            minutes INTEGER NOT NULL,
+            goals_scored INTEGER NOT NULL,
+            assists INTEGER NOT NULL,
+            clean_sheets INTEGER NOT NULL,
+            total_points INTEGER NOT NULL,
+            PRIMARY KEY (id, gw),
+            CONSTRAINT uq_player_gw_stats_player_id_gw UNIQUE (player_id, gw)
+        ) PARTITION BY RANGE (gw)
+        """
+    )
+    for lo, hi in PARTITION_RANGES:
+        op.execute(
+            f"CREATE TABLE player_gw_stats_p{lo}_{hi - 1} PARTITION OF player_gw_stats "
+            f"FOR VALUES FROM ({lo}) TO ({hi})"
+        )
+    op.execute("CREATE TABLE player_gw_stats_pdefault PARTITION OF player_gw_stats DEFAULT")
+
+    # Partitioned indexes matching the old table's set.
+    op.create_index("ix_player_gw_stats_gw", "player_gw_stats", ["gw"])
+    op.create_index("ix_player_gw_stats_player_id", "player_gw_stats", ["player_id"])
+    op.create_index(
+        "ix_pgs_player_gw_inc_points",
+        "player_gw_stats",
+        ["player_id", "gw"],
+        postgresql_include=["total_points"],
+    )
+
+    op.execute(
+        """
+        INSERT INTO player_gw_stats
+            (id, player_id, gw, minutes, goals_scored, assists, clean_sheets, total_points)
+        SELECT id, player_id, gw, minutes, goals_scored, assists, clean_sheets, total_points
+        FROM player_gw_stats_old
+        """
+    )
+    op.execute(
+        """
+        SELECT setval(
+            pg_get_serial_sequence('player_gw_stats', 'id'),
+            COALESCE((SELECT MAX(id) FROM player_gw_stats), 1)
+        )
+        """
+    )
+    op.execute("DROP TABLE player_gw_stats_old")
+
+
+def downgrade():
+    op.execute("ALTER TABLE player_gw_stats RENAME TO player_gw_stats_part")
+    _rename_relations_aside("player_gw_stats_part")
+    op.execute(
+        """
+        CREATE TABLE player_gw_stats (
+            id SERIAL PRIMARY KEY,
+            player_id INTEGER NOT NULL REFERENCES players (id),
+            gw INTEGER NOT NULL,
+            minutes INTEGER NOT NULL,
+            goals_scored INTEGER NOT NULL,
+            assists INTEGER NOT NULL,
+            clean_sheets INTEGER NOT NULL,
+            total_points INTEGER NOT NULL,
+            CONSTRAINT uq_player_gw_stats_player_id_gw UNIQUE (player_id, gw)
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO player_gw_stats
+            (id, player_id, gw, minutes, goals_scored, assists, clean_sheets, total_points)
+        SELECT id, player_id, gw, minutes, goals_scored, assists, clean_sheets, total_points
+        FROM player_gw_stats_part
+        """
+    )
+    op.execute(
+        """
+        SELECT setval(
+            pg_get_serial_sequence('player_gw_stats', 'id'),
+            COALESCE((SELECT MAX(id) FROM player_gw_stats), 1)
+        )
+        """
+    )
+    op.execute("DROP TABLE player_gw_stats_part")
+    op.create_index("ix_player_gw_stats_gw", "player_gw_stats", ["gw"])
+    op.create_index("ix_player_gw_stats_player_id", "player_gw_stats", ["player_id"])
+    op.create_index(
+        "ix_pgs_player_gw_inc_points",
+        "player_gw_stats",
+        ["player_id", "gw"],
+        postgresql_include=["total_points"],
+    )
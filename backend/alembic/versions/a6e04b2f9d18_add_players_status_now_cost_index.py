@@ -0,0 +1,32 @@
+"""add players status/now_cost index
+
+Revision ID: a6e04b2f9d18
+Revises: f2a91c7d03e5
+Create Date: 2026-08-30 10:21:52.330467
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e04b2f9d18'
+down_revision: Union[str, Sequence[str], None] = 'f2a91c7d03e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # The "value" ordering (predicted_points / (now_cost + 1)) crosses the
+    # predictions/players join, so it cannot be indexed directly; keep the
+    # player-side filters cheap instead so the join input stays small.
+    op.create_index(
+        "ix_players_status_now_cost",
+        "players",
+        ["status", "now_cost"],
+    )
+
+def downgrade():
+    op.drop_index("ix_players_status_now_cost", table_name="players")
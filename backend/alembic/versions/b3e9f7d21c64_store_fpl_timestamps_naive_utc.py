@@ -0,0 +1,42 @@
+"""store fpl timestamps naive utc
+
+Revision ID: b3e9f7d21c64
+Revises: a1b7e4c92d55
+Create Date: 2026-08-30 13:38:12.951420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9f7d21c64'
+down_revision: Union[str, Sequence[str], None] = 'a1b7e4c92d55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # App invariant: these columns are always UTC, so store them naive and
+    # let the driver decode plain datetimes without per-value tz conversion.
+    # The read boundary re-tags them via utils.fpl_dates.as_utc.
+    op.execute(
+        "ALTER TABLE gameweeks ALTER COLUMN deadline_time TYPE timestamp "
+        "USING deadline_time AT TIME ZONE 'UTC'"
+    )
+    op.execute(
+        "ALTER TABLE fixtures ALTER COLUMN kickoff_time TYPE timestamp "
+        "USING kickoff_time AT TIME ZONE 'UTC'"
+    )
+
+def downgrade():
+    op.execute(
+        "ALTER TABLE fixtures ALTER COLUMN kickoff_time TYPE timestamptz "
+        "USING kickoff_time AT TIME ZONE 'UTC'"
+    )
+    op.execute(
+        "ALTER TABLE gameweeks ALTER COLUMN deadline_time TYPE timestamptz "
+        "USING deadline_time AT TIME ZONE 'UTC'"
+    )
@@ -0,0 +1,30 @@
+"""add players web_name trigram index
+
+Revision ID: b8f3d1a92c47
+Revises: 4ea18d2b0dde
+Create Date: 2026-08-30 09:12:44.291038
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f3d1a92c47'
+down_revision: Union[str, Sequence[str], None] = '4ea18d2b0dde'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # The plain btree ix_players_web_name cannot serve ILIKE '%x%' searches;
+    # a pg_trgm GIN index can.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_players_web_name_trgm ON players USING gin (web_name gin_trgm_ops)"
+    )
+
+def downgrade():
+    op.drop_index("ix_players_web_name_trgm", table_name="players")
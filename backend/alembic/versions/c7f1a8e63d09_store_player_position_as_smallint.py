@@ -0,0 +1,60 @@
+"""store player position as smallint
+
+Revision ID: c7f1a8e63d09
+Revises: b3e9f7d21c64
+Create Date: 2026-08-30 14:02:58.733261
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f1a8e63d09'
+down_revision: Union[str, Sequence[str], None] = 'b3e9f7d21c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # SMALLINT codes (0=UNK, 1=GKP, 2=DEF, 3=MID, 4=FWD): ~4x smaller index
+    # entries than String(3) and integer comparisons in filters/joins. The
+    # app still reads and writes the string labels via PositionType.
+    op.add_column("players", sa.Column("position_i", sa.SmallInteger(), nullable=True))
+    op.execute(
+        """
+        UPDATE players SET position_i = CASE position
+            WHEN 'GKP' THEN 1
+            WHEN 'DEF' THEN 2
+            WHEN 'MID' THEN 3
+            WHEN 'FWD' THEN 4
+            ELSE 0
+        END
+        """
+    )
+    op.alter_column("players", "position_i", nullable=False)
+    op.drop_index(op.f("ix_players_position"), table_name="players")
+    op.drop_column("players", "position")
+    op.alter_column("players", "position_i", new_column_name="position")
+    op.create_index(op.f("ix_players_position"), "players", ["position"])
+
+def downgrade():
+    op.add_column("players", sa.Column("position_s", sa.String(length=3), nullable=True))
+    op.execute(
+        """
+        UPDATE players SET position_s = CASE position
+            WHEN 1 THEN 'GKP'
+            WHEN 2 THEN 'DEF'
+            WHEN 3 THEN 'MID'
+            WHEN 4 THEN 'FWD'
+            ELSE 'UNK'
+        END
+        """
+    )
+    op.alter_column("players", "position_s", nullable=False)
+    op.drop_index(op.f("ix_players_position"), table_name="players")
+    op.drop_column("players", "position")
+    op.alter_column("players", "position_s", new_column_name="position")
+    op.create_index(op.f("ix_players_position"), "players", ["position"])
@@ -0,0 +1,32 @@
+"""add predictions gw/model/player index
+
+Revision ID: d4f8b2c6a910
+Revises: a6e04b2f9d18
+Create Date: 2026-08-30 11:24:51.402318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8b2c6a910'
+down_revision: Union[str, Sequence[str], None] = 'a6e04b2f9d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Candidate queries filter on (target_gw, model_name) and join players on
+    # player_id; keeping the join key in the index makes the predictions side
+    # an index-only scan.
+    op.create_index(
+        "ix_pred_gw_model_player",
+        "predictions",
+        ["target_gw", "model_name", "player_id"],
+    )
+
+def downgrade():
+    op.drop_index("ix_pred_gw_model_player", table_name="predictions")
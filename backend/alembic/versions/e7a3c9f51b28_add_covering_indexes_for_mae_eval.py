@@ -0,0 +1,46 @@
+"""add covering indexes for mae eval
+
+Revision ID: e7a3c9f51b28
+Revises: d4f8b2c6a910
+Create Date: 2026-08-30 12:05:33.610947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9f51b28'
+down_revision: Union[str, Sequence[str], None] = 'd4f8b2c6a910'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Rebuild the predictions index with predicted_points as INCLUDE payload
+    # and add a matching covering index on player_gw_stats, so the MAE
+    # evaluation join is index-only on both sides (no heap fetches).
+    op.drop_index("ix_pred_gw_model_player", table_name="predictions")
+    op.create_index(
+        "ix_pred_gw_model_player",
+        "predictions",
+        ["target_gw", "model_name", "player_id"],
+        postgresql_include=["predicted_points"],
+    )
+    op.create_index(
+        "ix_pgs_player_gw_inc_points",
+        "player_gw_stats",
+        ["player_id", "gw"],
+        postgresql_include=["total_points"],
+    )
+
+def downgrade():
+    op.drop_index("ix_pgs_player_gw_inc_points", table_name="player_gw_stats")
+    op.drop_index("ix_pred_gw_model_player", table_name="predictions")
+    op.create_index(
+        "ix_pred_gw_model_player",
+        "predictions",
+        ["target_gw", "model_name", "player_id"],
+    )
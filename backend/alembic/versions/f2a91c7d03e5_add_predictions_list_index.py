@@ -0,0 +1,31 @@
+"""add predictions list index
+
+Revision ID: f2a91c7d03e5
+Revises: b8f3d1a92c47
+Create Date: 2026-08-30 10:03:18.774215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a91c7d03e5'
+down_revision: Union[str, Sequence[str], None] = 'b8f3d1a92c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # list/top predictions filter on (target_gw, model_name) and order by
+    # predicted_points DESC; this index serves both without a Sort node.
+    op.create_index(
+        "ix_pred_gw_model_points",
+        "predictions",
+        ["target_gw", "model_name", sa.text("predicted_points DESC")],
+    )
+
+def downgrade():
+    op.drop_index("ix_pred_gw_model_points", table_name="predictions")
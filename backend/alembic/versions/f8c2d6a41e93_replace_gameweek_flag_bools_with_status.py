@@ -0,0 +1,64 @@
+"""replace gameweek flag bools with status
+
+Revision ID: f8c2d6a41e93
+Revises: e7a3c9f51b28
+Create Date: 2026-08-30 12:41:27.093184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c2d6a41e93'
+down_revision: Union[str, Sequence[str], None] = 'e7a3c9f51b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # One SMALLINT lifecycle column (0=future, 1=next, 2=current,
+    # 3=current+finished, 4=finished) replaces three indexed bools; a partial
+    # index covers the active statuses the app actually looks up.
+    op.add_column("gameweeks", sa.Column("status", sa.SmallInteger(), nullable=True))
+    op.execute(
+        """
+        UPDATE gameweeks SET status = CASE
+            WHEN is_next THEN 1
+            WHEN is_current AND is_finished THEN 3
+            WHEN is_current THEN 2
+            WHEN is_finished THEN 4
+            ELSE 0
+        END
+        """
+    )
+    op.alter_column("gameweeks", "status", nullable=False, server_default="0")
+    op.drop_index("ix_gameweeks_is_current", table_name="gameweeks")
+    op.drop_index("ix_gameweeks_is_next", table_name="gameweeks")
+    op.drop_index("ix_gameweeks_is_finished", table_name="gameweeks")
+    op.drop_column("gameweeks", "is_current")
+    op.drop_column("gameweeks", "is_next")
+    op.drop_column("gameweeks", "is_finished")
+    op.execute(
+        "CREATE INDEX ix_gameweeks_status_active ON gameweeks (status) WHERE status IN (1, 2, 3)"
+    )
+
+def downgrade():
+    op.drop_index("ix_gameweeks_status_active", table_name="gameweeks")
+    op.add_column("gameweeks", sa.Column("is_current", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column("gameweeks", sa.Column("is_next", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column("gameweeks", sa.Column("is_finished", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.execute(
+        """
+        UPDATE gameweeks SET
+            is_current = status IN (2, 3),
+            is_next = status = 1,
+            is_finished = status IN (3, 4)
+        """
+    )
+    op.create_index("ix_gameweeks_is_current", "gameweeks", ["is_current"])
+    op.create_index("ix_gameweeks_is_next", "gameweeks", ["is_next"])
+    op.create_index("ix_gameweeks_is_finished", "gameweeks", ["is_finished"])
+    op.drop_column("gameweeks", "status")
@@ -6,6 +6,7 @@ from sqlalchemy import select, func
 
 from app.core.db import get_db
 from app.models.fixture import Fixture
+from app.utils.fpl_dates import as_utc
 
 router = APIRouter(prefix="/fixtures", tags=["fixtures"])
 
@@ -14,10 +15,12 @@ def list_fixtures(
     team_id: Optional[int] = None,
     finished: Optional[bool] = None,
     limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
+    after_id: Optional[int] = Query(default=None, ge=0),
     db: Session = Depends(get_db),
 ):
-    stmt = select(Fixture)
+    # COUNT(*) OVER() folds the total into the paged query, so one scan
+    # services both the rows and the count.
+    stmt = select(Fixture, func.count().over().label("total"))
 
     if team_id is not None:
         stmt = stmt.where((Fixture.home_team_id == team_id) | (Fixture.away_team_id == team_id))
@@ -25,24 +28,30 @@ def list_fixtures(
     if finished is not None:
         stmt = stmt.where(Fixture.finished == finished)
 
-    total = db.execute(
-        select(func.count()).select_from(stmt.subquery())
-    ).scalar_one()
+    # Keyset pagination: seek past the last seen id on the PK index instead of
+    # scanning and discarding OFFSET rows.
+    if after_id is not None:
+        stmt = stmt.where(Fixture.id > after_id)
 
+    rows = db.execute(
+        stmt.order_by(Fixture.id).limit(limit)
+    ).all()
 
-    fixtures = db.execute(
-        stmt.order_by(Fixture.id).offset(offset).limit(limit)
-    ).scalars().all()
+    total = rows[0].total if rows else 0
+    fixtures = [r[0] for r in rows]
+    next_after_id = fixtures[-1].id if fixtures else None
 
     return {
-        "meta": {"total": total, "limit": limit, "offset": offset},
+        "meta": {"total": total, "limit": limit, "next_after_id": next_after_id},
         "fixtures": [
             {
                 "id": f.id,
                 "fpl_fixture_id": f.fpl_fixture_id,
                 "home_team_id": f.home_team_id,
                 "away_team_id": f.away_team_id,
-                "kickoff_time": f.kickoff_time.isoformat() if f.kickoff_time else None,
+                # orjson serializes datetimes to ISO-8601 natively; re-tag
+                # the stored naive-UTC value so the offset stays on the wire
+                "kickoff_time": as_utc(f.kickoff_time),
                 "finished": f.finished,
                 "home_score": f.home_score,
                 "away_score": f.away_score,
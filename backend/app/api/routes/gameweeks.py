@@ -1,97 +1,91 @@
-from typing import Optional
-from datetime import datetime, timezone
-
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-import httpx
 
 from app.core.db import get_db
-from app.models.gameweek import Gameweek
+from app.services.fpl_client import fetch_json
+from app.utils.fpl_dates import as_utc, parse_dt
+from app.models.gameweek import CURRENT_STATUSES, FINISHED_STATUSES, Gameweek, GwStatus
 
 router = APIRouter(prefix="/gameweeks", tags=["gameweeks"])
 
 FPL_BOOTSTRAP_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
 
-def parse_dt(s: Optional[str]) -> Optional[datetime]:
-    if not s:
-        return None
-    # FPL uses ISO strings like "2025-08-15T17:30:00Z"
-    if s.endswith("Z"):
-        s = s.replace("Z", "+00:00")
-    return datetime.fromisoformat(s)
-
 @router.post("/ingest/fpl")
-def ingest_gameweeks(db: Session = Depends(get_db)):
-    # fetch bootstrap
-    data = httpx.get(FPL_BOOTSTRAP_URL, timeout=20).json()
+async def ingest_gameweeks(db: Session = Depends(get_db)):
+    # fetch bootstrap (await frees the event loop during the FPL round-trip)
+    data = await fetch_json(FPL_BOOTSTRAP_URL)
     events = data.get("events", [])
 
-    inserted = 0
-    updated = 0
+    # Preload existing rows once instead of one SELECT per event.
+    existing_gws = {g.gw: g for g in db.execute(select(Gameweek)).scalars().all()}
+
+    # Split into insert/update mapping lists and apply with the bulk_*
+    # session APIs: they skip per-instance events, identity-map checks, and
+    # attribute history, and stay dialect-agnostic (no ON CONFLICT needed).
+    to_insert = []
+    to_update = []
 
     for e in events:
         gw = int(e["id"])
-        deadline = parse_dt(e.get("deadline_time"))
-        is_current = bool(e.get("is_current"))
-        is_next = bool(e.get("is_next"))
-        is_finished = bool(e.get("finished"))
-        name = e.get("name")
+        values = {
+            "gw": gw,
+            "deadline_time": parse_dt(e.get("deadline_time")),
+            "status": int(
+                GwStatus.from_flags(
+                    is_current=bool(e.get("is_current")),
+                    is_next=bool(e.get("is_next")),
+                    is_finished=bool(e.get("finished")),
+                )
+            ),
+            "name": e.get("name"),
+        }
 
-        existing = db.execute(select(Gameweek).where(Gameweek.gw == gw)).scalars().first()
+        existing = existing_gws.get(gw)
         if existing is None:
-            db.add(
-                Gameweek(
-                    gw=gw,
-                    deadline_time=deadline,
-                    is_current=is_current,
-                    is_next=is_next,
-                    is_finished=is_finished,
-                    name=name,
-                )
-            )
-            inserted += 1
+            to_insert.append(values)
         else:
-            changed = False
-            if existing.deadline_time != deadline:
-                existing.deadline_time = deadline
-                changed = True
-            if existing.is_current != is_current:
-                existing.is_current = is_current
-                changed = True
-            if existing.is_next != is_next:
-                existing.is_next = is_next
-                changed = True
-            if existing.is_finished != is_finished:
-                existing.is_finished = is_finished
-                changed = True
-            if existing.name != name:
-                existing.name = name
-                changed = True
-            if changed:
-                updated += 1
+            # Single tuple compare instead of field-by-field checks; unchanged
+            # rows never reach the update list, so no UPDATE is emitted.
+            cur = (existing.deadline_time, existing.status, existing.name)
+            new = (values["deadline_time"], values["status"], values["name"])
+            if cur != new:
+                to_update.append({"id": existing.id, **values})
+
+    if to_insert:
+        db.bulk_insert_mappings(Gameweek, to_insert)
+    if to_update:
+        db.bulk_update_mappings(Gameweek, to_update)
+
+    inserted = len(to_insert)
+    updated = len(to_update)
 
     db.commit()
 
     return {"gameweeks": {"inserted": inserted, "updated": updated, "total_source": len(events)}}
 
 
+def _gw_block(row):
+    if row is None:
+        return None
+    return {
+        "gw": row.gw,
+        "deadline_time": as_utc(row.deadline_time).isoformat() if row.deadline_time else None,
+        # derived from the status enum; payload key kept for API stability
+        "is_finished": row.status in FINISHED_STATUSES,
+        "name": row.name,
+    }
+
+
 @router.get("/current")
 def current_and_next(db: Session = Depends(get_db)):
-    current = db.execute(select(Gameweek).where(Gameweek.is_current == True)).scalars().first()
-    nxt = db.execute(select(Gameweek).where(Gameweek.is_next == True)).scalars().first()
+    # Column projection instead of ORM entities: this is a read-only JSON
+    # path, so there is nothing to gain from identity-map hydration.
+    cols = (Gameweek.gw, Gameweek.deadline_time, Gameweek.status, Gameweek.name)
+    current = db.execute(select(*cols).where(Gameweek.status.in_(CURRENT_STATUSES))).first()
+    nxt = db.execute(select(*cols).where(Gameweek.status == GwStatus.NEXT)).first()
 
     return {
-        "current": {
-            "gw": current.gw,
-            "deadline_time": current.deadline_time.isoformat() if current and current.deadline_time else None,
-            "is_finished": current.is_finished if current else None,
-            "name": current.name if current else None,
-        } if current else None,
-        "next": {
-            "gw": nxt.gw,
-            "deadline_time": nxt.deadline_time.isoformat() if nxt and nxt.deadline_time else None,
-            "is_finished": nxt.is_finished if nxt else None,
-            "name": nxt.name if nxt else None,
-        } if nxt else None,
+        "current": _gw_block(current),
+        "next": _gw_block(nxt),
     }
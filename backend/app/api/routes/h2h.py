@@ -6,6 +6,7 @@ from sqlalchemy import or_, and_, desc
 from app.core.db import get_db
 from app.models.fixture import Fixture
 from app.models.team import Team
+from app.utils.fpl_dates import as_utc
 
 router = APIRouter(prefix="/h2h", tags=["match"])
 
@@ -88,7 +89,7 @@ def head_to_head(
             {
                 "fixture_id": f.id,
                 "fpl_fixture_id": getattr(f, "fpl_fixture_id", None),
-                "kickoff_time": f.kickoff_time.isoformat() if f.kickoff_time else None,
+                "kickoff_time": as_utc(f.kickoff_time).isoformat() if f.kickoff_time else None,
                 "fixture_home_team_id": f.home_team_id,
                 "fixture_away_team_id": f.away_team_id,
                 "home_team_id": home_team_id,
@@ -6,6 +6,7 @@ import math
 from app.core.db import get_db
 from app.models.fixture import Fixture
 from app.models.team import Team
+from app.utils.fpl_dates import as_utc
 from app.models.match_prediction import MatchPrediction
 from app.utils.model_metadata_store import maybe_load_model_metadata_artifact
 
@@ -150,7 +151,7 @@ def run_match_baseline_and_store(
         "ok": True,
         "fixture": {
             "id": fixture.id,
-            "kickoff_time": fixture.kickoff_time.isoformat(),
+            "kickoff_time": as_utc(fixture.kickoff_time).isoformat(),
             "home_team_id": home_id,
             "home_team_name": home_name,
             "away_team_id": away_id,
@@ -219,7 +220,7 @@ def list_match_predictions(
             {
                 "fixture_id": f.id,
                 "gw": f.gw,
-                "kickoff_time": f.kickoff_time.isoformat() if f.kickoff_time else None,
+                "kickoff_time": as_utc(f.kickoff_time).isoformat() if f.kickoff_time else None,
                 "home_team_id": f.home_team_id,
                 "home_team_name": team_name.get(f.home_team_id, f"Unknown({f.home_team_id})"),
                 "away_team_id": f.away_team_id,
@@ -358,7 +359,7 @@ def run_match_baseline_for_gw(
                 {
                     "fixture_id": f.id,
                     "gw": gw,
-                    "kickoff_time": f.kickoff_time.isoformat() if f.kickoff_time else None,
+                    "kickoff_time": as_utc(f.kickoff_time).isoformat() if f.kickoff_time else None,
                     "home_team_id": home_id,
                     "home_team_name": home_name,
                     "away_team_id": away_id,
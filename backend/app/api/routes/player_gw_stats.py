@@ -14,24 +14,33 @@ def list_player_gw_stats(
     player_id: Optional[int] = None,
     gw: Optional[int] = None,
     limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
+    after_id: Optional[int] = Query(default=None, ge=0),
     db: Session = Depends(get_db),
 ):
-    stmt = select(PlayerGameweekStat)
+    # COUNT(*) OVER() folds the total into the paged query, so one scan
+    # services both the rows and the count.
+    stmt = select(PlayerGameweekStat, func.count().over().label("total"))
 
     if player_id is not None:
         stmt = stmt.where(PlayerGameweekStat.player_id == player_id)
     if gw is not None:
         stmt = stmt.where(PlayerGameweekStat.gw == gw)
 
-    total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar_one()
+    # Keyset pagination: seek past the last seen id on the PK index instead of
+    # scanning and discarding OFFSET rows.
+    if after_id is not None:
+        stmt = stmt.where(PlayerGameweekStat.id > after_id)
 
-    rows = db.execute(
-        stmt.order_by(PlayerGameweekStat.id).offset(offset).limit(limit)
-    ).scalars().all()
+    result = db.execute(
+        stmt.order_by(PlayerGameweekStat.id).limit(limit)
+    ).all()
+
+    total = result[0].total if result else 0
+    rows = [r[0] for r in result]
+    next_after_id = rows[-1].id if rows else None
 
     return {
-        "meta": {"total": total, "limit": limit, "offset": offset},
+        "meta": {"total": total, "limit": limit, "next_after_id": next_after_id},
         "rows": [
             {
                 "id": r.id,
@@ -16,7 +16,7 @@ def list_players(
     team_id: Optional[int] = None,
     search: Optional[str] = Query(default=None, min_length=1),
     limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
+    after_id: Optional[int] = Query(default=None, ge=0),
     db: Session = Depends(get_db),
 ):
     """
@@ -25,7 +25,9 @@ def list_players(
     - team_id: integer team id in our DB
     - search: partial match on web_name
     """
-    stmt = select(Player)
+    # COUNT(*) OVER() folds the total into the paged query, so one scan
+    # services both the rows and the count.
+    stmt = select(Player, func.count().over().label("total"))
 
     if position is not None:
         stmt = stmt.where(Player.position == position)
@@ -36,14 +38,21 @@ def list_players(
     if search is not None:
         stmt = stmt.where(Player.web_name.ilike(f"%{search}%"))
 
-    total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar_one()
+    # Keyset pagination: seek past the last seen id on the PK index instead of
+    # scanning and discarding OFFSET rows.
+    if after_id is not None:
+        stmt = stmt.where(Player.id > after_id)
 
-    stmt = stmt.order_by(Player.id).offset(offset).limit(limit)
+    rows = db.execute(
+        stmt.order_by(Player.id).limit(limit)
+    ).all()
 
-    players = db.execute(stmt).scalars().all()
+    total = rows[0].total if rows else 0
+    players = [r[0] for r in rows]
+    next_after_id = players[-1].id if players else None
 
     return {
-        "meta": {"total": total, "limit": limit, "offset": offset},
+        "meta": {"total": total, "limit": limit, "next_after_id": next_after_id},
         "players": [
             {
                 "id": p.id,
@@ -1,13 +1,17 @@
+import time
 from typing import Optional, Literal
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func as sa_func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, lambda_stmt, literal, select, text, or_, func as sa_func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.core.db import get_db
+from app.core.db import get_db, get_async_db
 from app.models.prediction import Prediction
 from app.models.player_gw_stat import PlayerGameweekStat
-from app.models.gameweek import Gameweek
+from app.models.gameweek import FINISHED_STATUSES, Gameweek, GwStatus
 from app.models.player import Player
 from app.models.team import Team
 
@@ -17,6 +21,23 @@ MODEL_NAME = "baseline_rollavg_v0"
 
 OrderBy = Literal["points", "cost", "value"]
 
+# Short-TTL response cache for /predictions/top: the UI hits the same small
+# parameter space repeatedly between prediction refreshes. Keys include a
+# per-target_gw version that run_baseline bumps, so a fresh model run evicts
+# stale shortlists immediately and the TTL is just a safety net.
+TOP_CACHE_TTL_SECONDS = 60.0
+TOP_CACHE_MAX_ENTRIES = 512
+_TOP_CACHE: dict = {}  # key -> (cached_at, payload)
+_PREDICTIONS_VERSION: dict = {}  # target_gw -> int
+
+
+def _predictions_version(target_gw: int) -> int:
+    return _PREDICTIONS_VERSION.get(target_gw, 0)
+
+
+def _bump_predictions_version(target_gw: int) -> None:
+    _PREDICTIONS_VERSION[target_gw] = _PREDICTIONS_VERSION.get(target_gw, 0) + 1
+
 
 def build_predictions_base_query(
     *,
@@ -29,66 +50,80 @@ def build_predictions_base_query(
     max_cost: Optional[int] = None,
     min_predicted_points: Optional[float] = None,
 ):
-    base = (
-        select(Prediction, Player, Team)
+    # lambda_stmt caches the compiled SQL per combination of active filters
+    # (keyed on lambda code locations), so repeat requests skip statement
+    # compilation; the closure variables become bound parameters. The column
+    # projection also means no Prediction/Player/Team ORM hydration per row.
+    base = lambda_stmt(
+        lambda: select(
+            Prediction.id.label("prediction_id"),
+            Prediction.player_id,
+            Prediction.target_gw,
+            Prediction.model_name,
+            Prediction.predicted_points,
+            Prediction.created_at,
+            Player.fpl_player_id,
+            Player.web_name,
+            Player.position,
+            Player.now_cost,
+            Player.status,
+            Player.team_id,
+            Team.short_name.label("team_short_name"),
+            Team.name.label("team_name"),
+        )
         .join(Player, Player.id == Prediction.player_id)
         .join(Team, Team.id == Player.team_id)
-        .where(
-            Prediction.target_gw == target_gw,
-            Prediction.model_name == model_name,
-        )
+    )
+    base += lambda s: s.where(
+        Prediction.target_gw == target_gw,
+        Prediction.model_name == model_name,
     )
 
     if position is not None:
-        base = base.where(Player.position == position)
+        base += lambda s: s.where(Player.position == position)
 
     if team_id is not None:
-        base = base.where(Player.team_id == team_id)
+        base += lambda s: s.where(Player.team_id == team_id)
 
     if status is not None:
-        base = base.where(Player.status == status)
+        base += lambda s: s.where(Player.status == status)
 
     if max_cost is not None:
-        base = base.where(Player.now_cost <= max_cost)
+        base += lambda s: s.where(Player.now_cost <= max_cost)
 
     if min_predicted_points is not None:
-        base = base.where(Prediction.predicted_points >= min_predicted_points)
+        base += lambda s: s.where(Prediction.predicted_points >= min_predicted_points)
 
     if search is not None:
-        base = base.where(Player.web_name.ilike(f"%{search}%"))
+        # Built outside the lambda: expressions over closure variables are not
+        # re-evaluated on cache hits, only the variables themselves are.
+        pattern = f"%{search}%"
+        base += lambda s: s.where(Player.web_name.ilike(pattern))
 
     return base
 
 
 def apply_predictions_ordering(base, order_by: OrderBy):
+    # One lambda per branch so each ordering caches as its own statement;
+    # Player.id is always the stable tie-breaker.
     if order_by == "points":
-        order_clause = Prediction.predicted_points.desc()
+        base += lambda s: s.order_by(Prediction.predicted_points.desc(), Player.id.asc())
     elif order_by == "cost":
-        order_clause = Player.now_cost.asc()
+        base += lambda s: s.order_by(Player.now_cost.asc(), Player.id.asc())
     else:  # value
-        order_clause = (Prediction.predicted_points / (Player.now_cost + 1)).desc()
-
-    # Always add a stable tie-breaker
-    return base.order_by(order_clause, Player.id.asc())
+        base += lambda s: s.order_by(
+            (Prediction.predicted_points / (Player.now_cost + 1)).desc(), Player.id.asc()
+        )
+    return base
 
 
-def serialize_prediction_row(pred: Prediction, pl: Player, tm: Team):
-    return {
-        "prediction_id": pred.id,
-        "player_id": pred.player_id,
-        "target_gw": pred.target_gw,
-        "model_name": pred.model_name,
-        "predicted_points": float(pred.predicted_points or 0.0),
-        "created_at": pred.created_at.isoformat() if pred.created_at else None,
-        "fpl_player_id": pl.fpl_player_id,
-        "web_name": pl.web_name,
-        "position": pl.position,
-        "now_cost": pl.now_cost,
-        "status": pl.status,
-        "team_id": pl.team_id,
-        "team_short_name": tm.short_name,
-        "team_name": tm.name,
-    }
+def serialize_prediction_row(row):
+    out = dict(row._mapping)
+    out.pop("_total", None)  # window-count column, reported in meta instead
+    out["predicted_points"] = float(out["predicted_points"] or 0.0)
+    # created_at stays a datetime: orjson renders it to RFC 3339 in C, which
+    # is cheaper than a per-row Python isoformat() call and wire-compatible.
+    return out
 
 def run_baseline_rollavg_v0_core(
     *,
@@ -96,77 +131,55 @@ def run_baseline_rollavg_v0_core(
     target_gw: Optional[int],
     window: int,
 ) -> dict:
+    # One round-trip for both bits of gameweek state: the "next" GW and the
+    # finished window are picked out of the same result set in Python.
+    gw_rows = db.execute(
+        select(Gameweek.gw, Gameweek.status)
+        .where(or_(Gameweek.status == GwStatus.NEXT, Gameweek.status.in_(FINISHED_STATUSES)))
+        .order_by(Gameweek.gw.desc())
+    ).all()
+
     if target_gw is None:
-        nxt = (
-            db.execute(select(Gameweek).where(Gameweek.is_next == True))
-            .scalars()
-            .first()
-        )
-        if nxt is None:
+        target_gw = next((int(r.gw) for r in gw_rows if r.status == GwStatus.NEXT), None)
+        if target_gw is None:
             return {"error": "No next gameweek found. Run /gameweeks/ingest/fpl first."}
-        target_gw = nxt.gw
-
-    finished_gws = (
-        db.execute(
-            select(Gameweek.gw)
-            .where(
-                Gameweek.is_finished == True,
-                Gameweek.gw < target_gw,
-            )
-            .order_by(Gameweek.gw.desc())
-            .limit(window)
-        )
-        .scalars()
-        .all()
-    )
+
+    finished_gws = [r.gw for r in gw_rows if r.status in FINISHED_STATUSES and r.gw < target_gw][:window]
 
     if len(finished_gws) == 0:
         return {"error": "No finished gameweeks found. Ingest gameweeks first."}
 
     finished_gws_sorted = sorted(finished_gws)
 
-    rows = db.execute(
+    # The whole model run is one INSERT ... SELECT: Postgres aggregates the
+    # rolling average and upserts it into predictions without the rows ever
+    # round-tripping through Python. xmax = 0 flags freshly inserted rows
+    # (same trick as the ingest routes).
+    avg_select = (
         select(
             PlayerGameweekStat.player_id,
-            sa_func.avg(PlayerGameweekStat.total_points).label("avg_points"),
+            literal(target_gw).label("target_gw"),
+            literal(MODEL_NAME).label("model_name"),
+            sa_func.avg(PlayerGameweekStat.total_points).label("predicted_points"),
         )
         .where(PlayerGameweekStat.gw.in_(finished_gws))
         .group_by(PlayerGameweekStat.player_id)
-    ).all()
-
-    inserted = 0
-    updated = 0
-
-    for player_id, avg_points in rows:
-        avg_points = float(avg_points or 0.0)
-
-        existing = (
-            db.execute(
-                select(Prediction).where(
-                    Prediction.player_id == player_id,
-                    Prediction.target_gw == target_gw,
-                    Prediction.model_name == MODEL_NAME,
-                )
-            )
-            .scalars()
-            .first()
-        )
+    )
 
-        if existing is None:
-            db.add(
-                Prediction(
-                    player_id=player_id,
-                    target_gw=target_gw,
-                    model_name=MODEL_NAME,
-                    predicted_points=avg_points,
-                )
-            )
-            inserted += 1
-        else:
-            existing.predicted_points = avg_points
-            updated += 1
+    stmt = pg_insert(Prediction).from_select(
+        ["player_id", "target_gw", "model_name", "predicted_points"],
+        avg_select,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["player_id", "target_gw", "model_name"],
+        set_={"predicted_points": stmt.excluded.predicted_points},
+    ).returning(text("(xmax = 0) AS inserted"))
+    flags = db.execute(stmt).scalars().all()
+    inserted = sum(1 for f in flags if f)
+    updated = len(flags) - inserted
 
     db.commit()
+    _bump_predictions_version(target_gw)
 
     return {
         "target_gw": target_gw,
@@ -175,7 +188,7 @@ def run_baseline_rollavg_v0_core(
         "model_name": MODEL_NAME,
         "inserted": inserted,
         "updated": updated,
-        "total_players_predicted": len(rows),
+        "total_players_predicted": len(flags),
     }
 
 @router.post("/baseline/run")
@@ -191,7 +204,7 @@ def run_baseline(
     )
 
 @router.get("")
-def list_predictions(
+async def list_predictions(
     target_gw: int,
     model_name: str = Query(default=MODEL_NAME),
     position: Optional[str] = None,
@@ -203,10 +216,21 @@ def list_predictions(
     order_by: OrderBy = Query(default="points"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-    db: Session = Depends(get_db),
+    exact_total: bool = Query(default=False),
+    after_points: Optional[float] = Query(default=None),
+    after_player_id: Optional[int] = Query(default=None, ge=0),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     List predictions for a target gameweek (paginated).
+
+    By default meta carries has_more (fetched via limit+1) instead of an
+    exact total; pass exact_total=true for admin-style views that need one.
+
+    With order_by=points, pass the previous page's meta.next_after_points /
+    meta.next_after_player_id instead of offset: the keyset filter matches
+    the (target_gw, model_name, predicted_points DESC) index, so deep pages
+    cost O(limit) rather than O(offset).
     """
     base = build_predictions_base_query(
         target_gw=target_gw,
@@ -219,26 +243,66 @@ def list_predictions(
         min_predicted_points=min_predicted_points,
     )
 
-    total = db.execute(
-        select(sa_func.count()).select_from(base.subquery())
-    ).scalar_one()
-
-    stmt = (
-        apply_predictions_ordering(base, order_by)
-        .offset(offset)
-        .limit(limit)
+    use_keyset = (
+        order_by == "points" and after_points is not None and after_player_id is not None
     )
+    if use_keyset:
+        offset = 0  # the cursor already encodes the page position
+        base += lambda s: s.where(
+            or_(
+                Prediction.predicted_points < after_points,
+                and_(
+                    Prediction.predicted_points == after_points,
+                    Player.id > after_player_id,
+                ),
+            )
+        )
 
-    results = db.execute(stmt).all()
-
-    return {
-        "meta": {"total": total, "limit": limit, "offset": offset},
-        "rows": [serialize_prediction_row(pred, pl, tm) for (pred, pl, tm) in results],
-    }
+    if exact_total:
+        # COUNT(*) OVER() folds the total into the paged query so the
+        # filtered Prediction/Player/Team join is evaluated once, not twice.
+        base += lambda s: s.add_columns(sa_func.count().over().label("_total"))
+
+    stmt = apply_predictions_ordering(base, order_by)
+
+    if exact_total:
+        stmt += lambda s: s.offset(offset).limit(limit)
+        results = (await db.execute(stmt)).all()
+        meta = {
+            "total": results[0]._total if results else 0,
+            "limit": limit,
+            "offset": offset,
+        }
+    else:
+        # Fetch one extra row instead of counting: infinite-scroll UIs only
+        # need to know whether another page exists.
+        fetch = limit + 1
+        stmt += lambda s: s.offset(offset).limit(fetch)
+        results = (await db.execute(stmt)).all()
+        meta = {
+            "limit": limit,
+            "offset": offset,
+            "has_more": len(results) > limit,
+        }
+        results = results[:limit]
+
+    rows = [serialize_prediction_row(r) for r in results]
+
+    if order_by == "points" and rows:
+        meta["next_after_points"] = rows[-1]["predicted_points"]
+        meta["next_after_player_id"] = rows[-1]["player_id"]
+
+    # Returning the Response directly skips FastAPI's jsonable_encoder pass
+    # over every row dict; the rows are already plain scalars, so orjson
+    # serializes them as-is.
+    return ORJSONResponse({
+        "meta": meta,
+        "rows": rows,
+    })
 
 
 @router.get("/top")
-def top_predictions(
+async def top_predictions(
     target_gw: int,
     model_name: str = Query(default=MODEL_NAME),
     position: Optional[str] = None,
@@ -250,7 +314,7 @@ def top_predictions(
     limit: int = Query(default=15, ge=1, le=200),
     # allow override availability filter
     status: str = Query(default="a"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Convenience shortlist endpoint for FPL-style weekly picks.
@@ -262,6 +326,15 @@ def top_predictions(
     """
     effective_status: Optional[str] = None if status == "all" else status
 
+    cache_key = (
+        _predictions_version(target_gw),
+        target_gw, model_name, position, team_id, effective_status,
+        search, max_cost, min_predicted_points, order_by, limit,
+    )
+    cached = _TOP_CACHE.get(cache_key)
+    if cached is not None and time.monotonic() - cached[0] < TOP_CACHE_TTL_SECONDS:
+        return ORJSONResponse(cached[1])
+
     base = build_predictions_base_query(
         target_gw=target_gw,
         model_name=model_name,
@@ -273,13 +346,19 @@ def top_predictions(
         min_predicted_points=min_predicted_points,
     )
 
-    stmt = apply_predictions_ordering(base, order_by).limit(limit)
-    results = db.execute(stmt).all()
+    stmt = apply_predictions_ordering(base, order_by)
+    stmt += lambda s: s.limit(limit)
+    results = (await db.execute(stmt)).all()
 
-    return {
+    payload = {
         "target_gw": target_gw,
         "model_name": model_name,
         "limit": limit,
         "order_by": order_by,
-        "rows": [serialize_prediction_row(pred, pl, tm) for (pred, pl, tm) in results],
+        "rows": [serialize_prediction_row(r) for r in results],
     }
+
+    if len(_TOP_CACHE) >= TOP_CACHE_MAX_ENTRIES:
+        _TOP_CACHE.clear()
+    _TOP_CACHE[cache_key] = (time.monotonic(), payload)
+    return ORJSONResponse(payload)
@@ -2,19 +2,22 @@
 
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Literal, Tuple
+from operator import attrgetter
+from typing import Dict, List, NamedTuple, Optional, Literal, Tuple
 from pydantic import BaseModel, Field
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func as sa_func
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import or_, select, func as sa_func
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
 from app.models.prediction import Prediction
 from app.models.player import Player
 from app.models.team import Team
-from app.models.gameweek import Gameweek
+from app.models.gameweek import Gameweek, GwStatus
 from app.models.player_gw_stat import PlayerGameweekStat
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
@@ -26,9 +29,11 @@ OrderBy = Literal["points", "value"]
 ViewMode = Literal["compact", "full"]
 
 SQUAD_RULES: Dict[Position, int] = {"GKP": 2, "DEF": 5, "MID": 5, "FWD": 3}
+SQUAD_RULES_ITEMS: Tuple[Tuple[Position, int], ...] = tuple(SQUAD_RULES.items())
 # Day13：先把 11 人首发凑齐（默认 3-4-3）
 STARTING_FORMATION: Dict[Position, int] = {"GKP": 1, "DEF": 3, "MID": 4, "FWD": 3}
-POSITION_CYCLE: List[Position] = ["FWD", "MID", "DEF", "GKP"]
+POSITION_CYCLE: Tuple[Position, ...] = ("FWD", "MID", "DEF", "GKP")
+POSITIONS_TUP: Tuple[Position, ...] = ("GKP", "DEF", "MID", "FWD")
 
 
 @router.get("/ping")
@@ -39,13 +44,56 @@ def ping():
 # -----------------------------
 # Helpers: querying candidates
 # -----------------------------
+# The "next gameweek" flag changes at most weekly, yet every /squad,
+# /transfers and /captain call without an explicit target_gw re-queried it.
+# A short per-process TTL keeps it one DB round trip per minute instead.
+NEXT_GW_CACHE_TTL_SECONDS = 60.0
+_NEXT_GW_CACHE: Optional[Tuple[float, int]] = None  # (cached_at, gw)
+
+
 def _decide_target_gw(db: Session, target_gw: Optional[int]) -> Tuple[Optional[int], Optional[str]]:
+    global _NEXT_GW_CACHE
     if target_gw is not None:
         return target_gw, None
-    nxt = db.execute(select(Gameweek).where(Gameweek.is_next == True)).scalars().first()
+    cached = _NEXT_GW_CACHE
+    if cached is not None and time.monotonic() - cached[0] < NEXT_GW_CACHE_TTL_SECONDS:
+        return cached[1], None
+    # Column projection: only the gw number is needed, not the ORM entity.
+    nxt = db.execute(select(Gameweek.gw).where(Gameweek.status == GwStatus.NEXT)).scalar_one_or_none()
     if nxt is None:
         return None, "No next gameweek found. Run /gameweeks/ingest/fpl first."
-    return int(nxt.gw), None
+    gw = int(nxt)
+    _NEXT_GW_CACHE = (time.monotonic(), gw)
+    return gw, None
+
+
+class Cand(NamedTuple):
+    """Flat candidate row for the squad builder.
+
+    The pick/feasibility loops touch these fields hundreds of times per
+    request, so candidates are plain scalars (no ORM attribute descriptors)
+    with cost_m/value computed once at load time.
+    """
+
+    prediction_id: int
+    player_id: int
+    fpl_player_id: int
+    web_name: str
+    position: str
+    now_cost: int
+    status: str
+    team_id: int
+    team_short_name: str
+    team_name: str
+    target_gw: int
+    model_name: str
+    predicted_points: float
+    created_at: Optional[datetime]
+    cost_m: float
+    value: float
+    # request-local dense indices for the bitmask/array state (see _SquadState)
+    idx: int
+    team_idx: int
 
 
 def _base_candidates_query(
@@ -56,8 +104,27 @@ def _base_candidates_query(
     max_cost: Optional[int],
     min_predicted_points: Optional[float],
 ):
+    # Column projection in Cand field order (minus the two computed fields).
+    # The (target_gw, model_name) filter plus player_id join key is covered
+    # by ix_pred_gw_model_player, so the predictions side can be resolved
+    # with an index-only scan.
     q = (
-        select(Prediction, Player, Team)
+        select(
+            Prediction.id,
+            Player.id,
+            Player.fpl_player_id,
+            Player.web_name,
+            Player.position,
+            Player.now_cost,
+            Player.status,
+            Team.id,
+            Team.short_name,
+            Team.name,
+            Prediction.target_gw,
+            Prediction.model_name,
+            Prediction.predicted_points,
+            Prediction.created_at,
+        )
         .join(Player, Player.id == Prediction.player_id)
         .join(Team, Team.id == Player.team_id)
         .where(
@@ -78,84 +145,131 @@ def _base_candidates_query(
     return q
 
 
-def _calc_cost_m(now_cost: int) -> float:
-    # FPL now_cost is like 80 => 8.0m
-    return float(now_cost) / 10.0
+def _cap_candidates_per_position(q, *, max_per_team: int):
+    """Limit candidates in SQL instead of loading the whole prediction table.
 
+    The builder only ever picks from three frontiers per position: high
+    predicted points, high value, and low cost (cheap enablers for the
+    feasibility lower bound). Rank each frontier with a window function and
+    keep rows on any of them, so the Python side sees a few dozen rows per
+    position instead of every candidate. One round trip covers all four
+    positions; no per-position LIMIT queries.
+    """
+    cap = max(SQUAD_RULES.values()) * max_per_team + 5
+    sub = q.add_columns(
+        sa_func.row_number()
+        .over(partition_by=Player.position, order_by=Prediction.predicted_points.desc())
+        .label("rn_pts"),
+        sa_func.row_number()
+        .over(partition_by=Player.position, order_by=Player.now_cost.asc())
+        .label("rn_cost"),
+        sa_func.row_number()
+        .over(
+            partition_by=Player.position,
+            order_by=(Prediction.predicted_points / (Player.now_cost + 1)).desc(),
+        )
+        .label("rn_val"),
+    ).subquery()
+    return select(sub).where(
+        or_(sub.c.rn_pts <= cap, sub.c.rn_cost <= cap, sub.c.rn_val <= cap)
+    )
 
-def _calc_value(predicted_points: float, cost_m: float) -> float:
+
+def _make_cand(row, *, idx: int, team_idx: int) -> Cand:
+    """Coerce a candidate row to final Python types exactly once.
+
+    now_cost/predicted_points arrive as Integer/Numeric from the driver;
+    every downstream consumer (sorts, feasibility, serialization) reads the
+    already-converted Cand fields, so no cast runs inside a hot loop.
+    """
+    cost_m = int(row[5]) / 10.0  # FPL now_cost is like 80 => 8.0m
+    pts = float(row[12] or 0.0)  # predicted_points
     # avoid div by zero; cost_m should never be 0, but be safe
-    denom = cost_m if cost_m > 0 else 0.1
-    return predicted_points / denom
+    value = pts / (cost_m if cost_m > 0 else 0.1)
+    return Cand(*row[:12], pts, row[13], cost_m, value, idx, team_idx)
 
 
-def _serialize_compact(pred: Prediction, pl: Player, tm: Team) -> dict:
-    cost_m = _calc_cost_m(int(pl.now_cost))
-    pts = float(pred.predicted_points)
-    val = _calc_value(pts, cost_m)
+def _serialize_compact(c: Cand) -> dict:
     return {
-        "name": pl.web_name,
-        "position": pl.position,
-        "team": tm.short_name,
-        "cost_m": round(cost_m, 1),
-        "predicted_points": round(pts, 2),
-        "value": round(val, 2),
-        "player_id": pl.id,
-        "fpl_player_id": pl.fpl_player_id,
-        "team_id": tm.id,
+        "name": c.web_name,
+        "position": c.position,
+        "team": c.team_short_name,
+        "cost_m": round(c.cost_m, 1),
+        "predicted_points": round(c.predicted_points, 2),
+        "value": round(c.value, 2),
+        "player_id": c.player_id,
+        "fpl_player_id": c.fpl_player_id,
+        "team_id": c.team_id,
     }
 
 
-def _serialize_full(pred: Prediction, pl: Player, tm: Team) -> dict:
-    cost_m = _calc_cost_m(int(pl.now_cost))
-    pts = float(pred.predicted_points)
-    val = _calc_value(pts, cost_m)
+def _serialize_full(c: Cand) -> dict:
     return {
-        "prediction_id": pred.id,
-        "player_id": pl.id,
-        "target_gw": pred.target_gw,
-        "model_name": pred.model_name,
-        "predicted_points": pts,
-        "value": val,
-        "created_at": pred.created_at.isoformat() if pred.created_at else None,
-        "fpl_player_id": pl.fpl_player_id,
-        "web_name": pl.web_name,
-        "position": pl.position,
-        "now_cost": pl.now_cost,
-        "status": pl.status,
-        "team_id": tm.id,
-        "team_short_name": tm.short_name,
-        "team_name": tm.name,
+        "prediction_id": c.prediction_id,
+        "player_id": c.player_id,
+        "target_gw": c.target_gw,
+        "model_name": c.model_name,
+        "predicted_points": c.predicted_points,
+        "value": c.value,
+        "created_at": c.created_at.isoformat() if c.created_at else None,
+        "fpl_player_id": c.fpl_player_id,
+        "web_name": c.web_name,
+        "position": c.position,
+        "now_cost": c.now_cost,
+        "status": c.status,
+        "team_id": c.team_id,
+        "team_short_name": c.team_short_name,
+        "team_name": c.team_name,
     }
 
 
-def _build_candidate_buckets(
-    rows: List[Tuple[Prediction, Player, Team]],
-) -> Dict[Position, List[Tuple[Prediction, Player, Team]]]:
-    buckets: Dict[Position, List[Tuple[Prediction, Player, Team]]] = {"GKP": [], "DEF": [], "MID": [], "FWD": []}
-    for pred, pl, tm in rows:
-        pos = pl.position
-        if pos in buckets:
-            buckets[pos].append((pred, pl, tm))
+def _build_candidate_buckets(cands: List[Cand]) -> Dict[Position, List[Cand]]:
+    buckets: Dict[Position, List[Cand]] = {p: [] for p in POSITIONS_TUP}
+    for c in cands:
+        if c.position in buckets:
+            buckets[c.position].append(c)
     return buckets
 
 
-def _sort_bucket(bucket: List[Tuple[Prediction, Player, Team]], order_by: OrderBy) -> List[Tuple[Prediction, Player, Team]]:
-    if order_by == "points":
-        return sorted(
-            bucket,
-            key=lambda r: (float(r[0].predicted_points), -int(r[1].now_cost), -int(r[2].id), -int(r[1].id)),
-            reverse=True,
-        )
-    # value
-    return sorted(
-        bucket,
-        key=lambda r: (
-            _calc_value(float(r[0].predicted_points), _calc_cost_m(int(r[1].now_cost))),
-            float(r[0].predicted_points),
-        ),
-        reverse=True,
-    )
+def _preprocess_buckets(
+    buckets: Dict[Position, List[Cand]],
+) -> Tuple[
+    Dict[Position, List[Cand]],
+    Dict[Position, List[Cand]],
+    Dict[Position, List[Cand]],
+    Dict[Position, List[float]],
+]:
+    """Build every per-position view the builder needs in one pass.
+
+    Per position: the cost-ascending list doubles as the sort base for the
+    points ordering (its tie-breaks are exactly the points ordering's
+    secondary keys), and its cost prefix sums are accumulated while it is
+    already in hand. Returns (ordered_points, ordered_value, cheap_sorted,
+    cheap_prefix).
+    """
+    ordered_points: Dict[Position, List[Cand]] = {}
+    ordered_value: Dict[Position, List[Cand]] = {}
+    cheap_sorted: Dict[Position, List[Cand]] = {}
+    cheap_prefix: Dict[Position, List[float]] = {}
+    for pos, bucket in buckets.items():
+        cheap = sorted(bucket, key=attrgetter("now_cost", "team_id", "player_id"))
+        cheap_sorted[pos] = cheap
+
+        acc = 0.0
+        prefix = [0.0]
+        for c in cheap:
+            acc += c.cost_m
+            prefix.append(acc)
+        cheap_prefix[pos] = prefix
+
+        pts = cheap.copy()
+        pts.sort(key=attrgetter("predicted_points"), reverse=True)
+        ordered_points[pos] = pts
+
+        val = sorted(bucket, key=attrgetter("predicted_points"), reverse=True)
+        val.sort(key=attrgetter("value"), reverse=True)
+        ordered_value[pos] = val
+    return ordered_points, ordered_value, cheap_sorted, cheap_prefix
 
 
 # -----------------------------
@@ -165,74 +279,91 @@ def _remaining_needed(required: Dict[Position, int], have: Dict[Position, int])
     return {p: max(0, required[p] - have.get(p, 0)) for p in required}
 
 
-def _sum_cheapest_cost_m(
-    *,
-    pos: Position,
-    k: int,
-    buckets: Dict[Position, List[Tuple[Prediction, Player, Team]]],
-    selected_player_ids: set,
-    team_counts: Dict[int, int],
-    max_per_team: int,
-) -> Optional[float]:
-    if k <= 0:
-        return 0.0
-
-    costs: List[float] = []
-    for pred, pl, tm in buckets[pos]:
-        if pl.id in selected_player_ids:
-            continue
-        if team_counts.get(tm.id, 0) >= max_per_team:
-            continue
-        costs.append(_calc_cost_m(int(pl.now_cost)))
+class _SquadState:
+    """Mutable pick state: an int bitmask over dense candidate indices plus a
+    fixed-size per-team counter array. Both are O(1) to test/update and make
+    cheap, exact memoization keys (no per-probe frozenset builds)."""
 
-    if len(costs) < k:
-        return None
+    __slots__ = ("selected_mask", "team_counts")
 
-    costs.sort()
-    return float(sum(costs[:k]))
+    def __init__(self, n_teams: int) -> None:
+        self.selected_mask = 0
+        self.team_counts = [0] * n_teams
 
 
 def _can_complete_squad(
     *,
     remaining_budget_m: float,
     remaining_needed_total: Dict[Position, int],
-    buckets: Dict[Position, List[Tuple[Prediction, Player, Team]]],
-    selected_player_ids: set,
-    team_counts: Dict[int, int],
+    cheap_sorted: Dict[Position, List[Cand]],
+    state: _SquadState,
     max_per_team: int,
+    cache: Optional[dict] = None,
+    cheap_prefix: Optional[Dict[Position, List[float]]] = None,
 ) -> bool:
-    # 1) Quantity check (with team cap applied)
-    for pos, need in remaining_needed_total.items():
-        if need <= 0:
-            continue
-        available = 0
-        for _, pl, tm in buckets[pos]:
-            if pl.id in selected_player_ids:
-                continue
-            if team_counts.get(tm.id, 0) >= max_per_team:
+    # Fast paths first: nothing left to buy is trivially feasible, and the
+    # static cheapest-k prefix sums give an O(positions) lower bound that
+    # rejects most over-budget probes without touching the per-player scan.
+    if cheap_prefix is not None:
+        lower_bound = 0.0
+        any_need = False
+        for pos, need in remaining_needed_total.items():
+            if need <= 0:
                 continue
-            available += 1
-        if available < need:
+            any_need = True
+            prefix = cheap_prefix[pos]
+            if need >= len(prefix):
+                return False
+            lower_bound += prefix[need]
+        if not any_need:
+            return True
+        if lower_bound > remaining_budget_m + 1e-9:
             return False
 
-    # 2) Lower-bound budget check: sum of cheapest possible players needed per position
+    # The alternating pick cycles revisit near-identical partial squads, so
+    # feasibility is memoized per request; costs are 0.1m multiples so the
+    # budget keys exactly as integer tenths.
+    team_counts = state.team_counts
+    selected_mask = state.selected_mask
+    if cache is not None:
+        key = (
+            selected_mask,
+            tuple(team_counts),
+            tuple(sorted(remaining_needed_total.items())),
+            round(remaining_budget_m * 10),
+        )
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    # One ascending-cost scan per position covers both checks: if the scan
+    # cannot collect `need` eligible players, quantity fails; the first
+    # `need` it does collect are exactly the cheapest-k budget lower bound.
+    ok = True
     min_possible = 0.0
     for pos, need in remaining_needed_total.items():
         if need <= 0:
             continue
-        s = _sum_cheapest_cost_m(
-            pos=pos,
-            k=need,
-            buckets=buckets,
-            selected_player_ids=selected_player_ids,
-            team_counts=team_counts,
-            max_per_team=max_per_team,
-        )
-        if s is None:
-            return False
-        min_possible += s
+        got = 0
+        for c in cheap_sorted[pos]:
+            if (selected_mask >> c.idx) & 1:
+                continue
+            if team_counts[c.team_idx] >= max_per_team:
+                continue
+            min_possible += c.cost_m
+            got += 1
+            if got == need:
+                break
+        if got < need:
+            ok = False
+            break
+
+    if ok:
+        ok = min_possible <= remaining_budget_m + 1e-9
 
-    return min_possible <= remaining_budget_m + 1e-9
+    if cache is not None:
+        cache[key] = ok
+    return ok
 
 
 
@@ -405,9 +536,8 @@ def _run_transfer_constraint_unit_checks() -> None:
 def _try_pick_one(
     *,
     pos: Position,
-    ordered_bucket: List[Tuple[Prediction, Player, Team]],
-    selected_player_ids: set,
-    team_counts: Dict[int, int],
+    ordered_bucket: List[Cand],
+    state: _SquadState,
     max_per_team: int,
     remaining_budget_m: float,
     # constraints:
@@ -416,8 +546,13 @@ def _try_pick_one(
     starting_have: Dict[Position, int],
     starting_required: Optional[Dict[Position, int]],  # None means not in starting phase
     # feasibility:
-    buckets_all: Dict[Position, List[Tuple[Prediction, Player, Team]]],
-) -> Tuple[Optional[Tuple[Prediction, Player, Team]], Optional[str]]:
+    cheap_sorted: Dict[Position, List[Cand]],
+    cheap_prefix: Optional[Dict[Position, List[float]]] = None,
+    feas_cache: Optional[dict] = None,
+    # resumable scan: maps cursor_key -> first index worth looking at again
+    cursors: Optional[Dict[tuple, int]] = None,
+    cursor_key: Optional[tuple] = None,
+) -> Tuple[Optional[Cand], Optional[str]]:
     """
     Pick the best feasible player from ordered_bucket for position=pos.
     Returns (picked_row, error_reason_if_none)
@@ -432,43 +567,59 @@ def _try_pick_one(
         if need_start <= 0:
             return None, f"Position={pos} already full for starting XI."
 
-    for pred, pl, tm in ordered_bucket:
-        if pl.id in selected_player_ids:
-            continue
-        if team_counts.get(tm.id, 0) >= max_per_team:
-            continue
-
-        cost_m = _calc_cost_m(int(pl.now_cost))
-        if cost_m > remaining_budget_m + 1e-9:
+    # The post-pick needs are identical for every candidate tried here (same
+    # position, same +1), so compute them once outside the scan loop.
+    remaining_needed_total = _remaining_needed(total_required, total_have)
+    remaining_needed_total[pos] = max(0, remaining_needed_total[pos] - 1)
+
+    # Selected players, saturated teams, and over-budget costs only ever
+    # accumulate across calls in a phase, so a bucket prefix rejected for
+    # those reasons stays rejected; remember how far it reaches and resume
+    # there next time instead of re-walking it every cycle.
+    start = cursors.get(cursor_key, 0) if cursors is not None else 0
+    prefix_blocked = start
+    in_prefix = True
+
+    team_counts = state.team_counts
+    for i in range(start, len(ordered_bucket)):
+        c = ordered_bucket[i]
+        if (
+            (state.selected_mask >> c.idx) & 1
+            or team_counts[c.team_idx] >= max_per_team
+            or c.cost_m > remaining_budget_m + 1e-9
+        ):
+            if in_prefix:
+                prefix_blocked = i + 1
             continue
+        in_prefix = False
 
         # Hypothetical add
-        selected_player_ids.add(pl.id)
-        team_counts[tm.id] = team_counts.get(tm.id, 0) + 1
+        state.selected_mask |= 1 << c.idx
+        team_counts[c.team_idx] += 1
         total_have[pos] = total_have.get(pos, 0) + 1
         if starting_required is not None:
             starting_have[pos] = starting_have.get(pos, 0) + 1
 
-        remaining_budget_after = remaining_budget_m - cost_m
-        remaining_needed_total = _remaining_needed(total_required, total_have)
+        remaining_budget_after = remaining_budget_m - c.cost_m
 
         feasible = _can_complete_squad(
             remaining_budget_m=remaining_budget_after,
             remaining_needed_total=remaining_needed_total,
-            buckets=buckets_all,
-            selected_player_ids=selected_player_ids,
-            team_counts=team_counts,
+            cheap_sorted=cheap_sorted,
+            state=state,
             max_per_team=max_per_team,
+            cache=feas_cache,
+            cheap_prefix=cheap_prefix,
         )
 
         if feasible:
-            return (pred, pl, tm), None
+            if cursors is not None:
+                cursors[cursor_key] = prefix_blocked
+            return c, None
 
         # rollback
-        selected_player_ids.remove(pl.id)
-        team_counts[tm.id] -= 1
-        if team_counts[tm.id] <= 0:
-            del team_counts[tm.id]
+        state.selected_mask &= ~(1 << c.idx)
+        team_counts[c.team_idx] -= 1
         total_have[pos] -= 1
         if total_have[pos] <= 0:
             del total_have[pos]
@@ -477,46 +628,64 @@ def _try_pick_one(
             if starting_have[pos] <= 0:
                 del starting_have[pos]
 
+    if cursors is not None:
+        cursors[cursor_key] = prefix_blocked
     return None, f"No feasible candidate for position={pos} under current constraints."
 
 
-def _pick_starting_xi(
+def _build_squad(
     *,
-    buckets: Dict[Position, List[Tuple[Prediction, Player, Team]]],
+    buckets: Dict[Position, List[Cand]],
     budget_m: float,
     max_per_team: int,
     total_required: Dict[Position, int],
     starting_required: Dict[Position, int],
-) -> Tuple[List[Tuple[Prediction, Player, Team]], float, Dict[int, int], Dict[Position, int], List[str]]:
-    """
-    Returns (starting_rows, remaining_budget, team_counts, total_have_counts, diagnostics_reasons)
+    n_teams: int,
+    team_ids_by_idx: List[int],
+    max_nodes: int = 600,
+) -> Tuple[List[Cand], List[Cand], float, Dict[int, int], Dict[Position, int], Dict[Position, int], List[str]]:
+    """Build the full 15-man squad in one bounded pass.
+
+    Phase 1 fills the starting XI with the alternating points/value cycles;
+    phase 2 fills the bench by value. Both phases share the selected set,
+    team counts, sorted views, feasibility cache, and scan cursors, and are
+    bounded by a single max_nodes budget (one node = one pick attempt)
+    instead of separate magic loop guards.
+
+    Returns (starting_rows, bench_rows, remaining_budget, team_counts,
+    total_have, starting_have, reasons) — the have-counts are the builder's
+    own tracked state, so callers don't recount the picked rows.
     """
-    selected_ids: set = set()
-    team_counts: Dict[int, int] = {}
+    state = _SquadState(n_teams)
     total_have: Dict[Position, int] = {}
     starting_have: Dict[Position, int] = {}
-    picked: List[Tuple[Prediction, Player, Team]] = []
+    starting: List[Cand] = []
+    bench: List[Cand] = []
     reasons: List[str] = []
 
-    # Prepare ordered buckets for both metrics
-    ordered_points = {p: _sort_bucket(buckets[p], "points") for p in buckets}
-    ordered_value = {p: _sort_bucket(buckets[p], "value") for p in buckets}
+    # Sorted views and per-request caches, shared by both phases.
+    ordered_points, ordered_value, cheap_sorted, cheap_prefix = _preprocess_buckets(buckets)
+    feas_cache: dict = {}
+    cursors: Dict[tuple, int] = {}
 
     remaining_budget = budget_m
+    nodes = 0
 
-    # We alternate cycles:
+    def note(msg: str) -> None:
+        # don't spam the response too much; only keep a few
+        if len(reasons) < 6:
+            reasons.append(msg)
+
+    # Phase 1: starting XI via alternating cycles
     # cycle A: points, positions in FWD->MID->DEF->GKP
     # cycle B: value,  positions in FWD->MID->DEF->GKP
-    # until starting XI complete
     def starting_done() -> bool:
         return all(starting_have.get(p, 0) >= starting_required[p] for p in starting_required)
 
     cycle = 0
-    guard = 0
     while not starting_done():
-        guard += 1
-        if guard > 2000:
-            reasons.append("Guard hit while building starting XI (unexpected loop).")
+        if nodes >= max_nodes:
+            note("Node budget exhausted while building starting XI.")
             break
 
         metric: OrderBy = "points" if cycle % 2 == 0 else "value"
@@ -527,108 +696,88 @@ def _pick_starting_xi(
             if starting_have.get(pos, 0) >= starting_required[pos]:
                 continue
 
+            nodes += 1
             picked_row, err = _try_pick_one(
                 pos=pos,
                 ordered_bucket=ordered[pos],
-                selected_player_ids=selected_ids,
-                team_counts=team_counts,
+                state=state,
                 max_per_team=max_per_team,
                 remaining_budget_m=remaining_budget,
                 total_have=total_have,
                 total_required=total_required,
                 starting_have=starting_have,
                 starting_required=starting_required,
-                buckets_all=buckets,
+                cheap_sorted=cheap_sorted,
+                cheap_prefix=cheap_prefix,
+                feas_cache=feas_cache,
+                cursors=cursors,
+                cursor_key=(pos, metric),
             )
             if picked_row is not None:
-                pred, pl, tm = picked_row
-                picked.append(picked_row)
-                remaining_budget -= _calc_cost_m(int(pl.now_cost))
+                starting.append(picked_row)
+                remaining_budget -= picked_row.cost_m
                 progress_this_cycle = True
-            else:
-                if err:
-                    # don't spam the response too much; only keep a few
-                    if len(reasons) < 6:
-                        reasons.append(f"[starting:{metric}] {err}")
+            elif err:
+                note(f"[starting:{metric}] {err}")
 
         if not progress_this_cycle:
             # cannot progress -> fail early
-            if len(reasons) < 6:
-                reasons.append("Cannot progress while building starting XI. Try relaxing filters.")
+            note("Cannot progress while building starting XI. Try relaxing filters.")
             break
 
         cycle += 1
 
-    return picked, remaining_budget, team_counts, total_have, reasons
-
-
-def _pick_bench(
-    *,
-    buckets: Dict[Position, List[Tuple[Prediction, Player, Team]]],
-    already_selected: List[Tuple[Prediction, Player, Team]],
-    remaining_budget_m: float,
-    team_counts: Dict[int, int],
-    total_have: Dict[Position, int],
-    total_required: Dict[Position, int],
-    max_per_team: int,
-) -> Tuple[List[Tuple[Prediction, Player, Team]], float, List[str]]:
-    selected_ids = {pl.id for _, pl, _ in already_selected}
-    picked: List[Tuple[Prediction, Player, Team]] = []
-    reasons: List[str] = []
-
-    ordered_value = {p: _sort_bucket(buckets[p], "value") for p in buckets}
+    if not starting_done():
+        team_counts = _dense_team_counts_to_dict(state.team_counts, team_ids_by_idx)
+        return starting, bench, remaining_budget, team_counts, total_have, starting_have, reasons
 
-    guard = 0
+    # Phase 2: fill the bench by value. Iterate pos order stable.
     while any(total_have.get(p, 0) < total_required[p] for p in total_required):
-        guard += 1
-        if guard > 3000:
-            reasons.append("Guard hit while building bench (unexpected loop).")
+        if nodes >= max_nodes:
+            note("Node budget exhausted while building bench.")
             break
 
         progress = False
-        # Bench: fill missing positions by value. Iterate pos order stable.
-        for pos in ["GKP", "DEF", "MID", "FWD"]:
-            pos = pos  # type: ignore[assignment]
-            need = total_required[pos] - total_have.get(pos, 0)
-            if need <= 0:
+        for pos in POSITIONS_TUP:
+            if total_required[pos] - total_have.get(pos, 0) <= 0:
                 continue
 
+            nodes += 1
             picked_row, err = _try_pick_one(
                 pos=pos,
                 ordered_bucket=ordered_value[pos],
-                selected_player_ids=selected_ids,
-                team_counts=team_counts,
+                state=state,
                 max_per_team=max_per_team,
-                remaining_budget_m=remaining_budget_m,
+                remaining_budget_m=remaining_budget,
                 total_have=total_have,
                 total_required=total_required,
                 starting_have={},            # not used in bench phase
                 starting_required=None,      # bench phase
-                buckets_all=buckets,
+                cheap_sorted=cheap_sorted,
+                cheap_prefix=cheap_prefix,
+                feas_cache=feas_cache,
+                cursors=cursors,
+                cursor_key=(pos, "value"),
             )
             if picked_row is not None:
-                pred, pl, tm = picked_row
-                picked.append(picked_row)
-                remaining_budget_m -= _calc_cost_m(int(pl.now_cost))
+                bench.append(picked_row)
+                remaining_budget -= picked_row.cost_m
                 progress = True
-            else:
-                if err and len(reasons) < 6:
-                    reasons.append(f"[bench:value] {err}")
+            elif err:
+                note(f"[bench:value] {err}")
 
         if not progress:
-            if len(reasons) < 6:
-                reasons.append("Cannot progress while building bench. Try relaxing filters.")
+            note("Cannot progress while building bench. Try relaxing filters.")
             break
 
-    return picked, remaining_budget_m, reasons
+    team_counts = _dense_team_counts_to_dict(state.team_counts, team_ids_by_idx)
+    return starting, bench, remaining_budget, team_counts, total_have, starting_have, reasons
 
 
-def _group_by_position(rows: List[Tuple[Prediction, Player, Team]]) -> Dict[Position, List[Tuple[Prediction, Player, Team]]]:
-    out: Dict[Position, List[Tuple[Prediction, Player, Team]]] = {"GKP": [], "DEF": [], "MID": [], "FWD": []}
-    for pred, pl, tm in rows:
-        if pl.position in out:
-            out[pl.position].append((pred, pl, tm))
-    return out
+def _dense_team_counts_to_dict(team_counts: List[int], team_ids_by_idx: List[int]) -> Dict[int, int]:
+    # back to {team_id: count} once, for the response/diagnostics only
+    return {team_ids_by_idx[i]: n for i, n in enumerate(team_counts) if n}
+
 
 def _get_recent_player_stats(
     *,
@@ -757,12 +906,25 @@ def recommend_squad(
     """
     decided_gw, err = _decide_target_gw(db, target_gw)
     if err is not None:
-        return {"error": err}
+        return ORJSONResponse({"error": err})
     assert decided_gw is not None
     target_gw = decided_gw
 
     effective_status: Optional[str] = None if status == "all" else status
 
+    # Built once: every return path (success or diagnostic) reuses these.
+    generated_at = datetime.now(timezone.utc).isoformat()
+    filters_block = {
+        "status": status,
+        "max_cost": max_cost,
+        "min_predicted_points": min_predicted_points,
+        "budget_m": budget_m,
+        "max_per_team": max_per_team,
+        "rules": SQUAD_RULES,
+        "starting_formation": STARTING_FORMATION,
+        "view": view,
+    }
+
     # Pull candidate rows
     q = _base_candidates_query(
         target_gw=target_gw,
@@ -771,121 +933,98 @@ def recommend_squad(
         max_cost=max_cost,
         min_predicted_points=min_predicted_points,
     )
-
-    rows = db.execute(q).all()
-    buckets = _build_candidate_buckets(rows)
+    # No single pick can exceed the whole budget; filter in SQL, not Python.
+    q = q.where(Player.now_cost <= int(budget_m * 10))
+    q = _cap_candidates_per_position(q, max_per_team=max_per_team)
+
+    # Assign dense request-local indices while flattening rows: idx feeds the
+    # selected bitmask, team_idx the fixed-size team counter array.
+    team_idx_map: Dict[int, int] = {}
+    cands = [
+        _make_cand(r, idx=i, team_idx=team_idx_map.setdefault(r[7], len(team_idx_map)))
+        for i, r in enumerate(db.execute(q).all())
+    ]
+    team_ids_by_idx = list(team_idx_map)
+    buckets = _build_candidate_buckets(cands)
 
     # Diagnostics: how many candidates per position under filters
     candidates_count = {p: len(buckets[p]) for p in buckets}
 
     # Quick fail if impossible even by raw counts (without team cap/budget)
     missing_by_position = {}
-    for pos, need in SQUAD_RULES.items():
+    for pos, need in SQUAD_RULES_ITEMS:
         have = candidates_count.get(pos, 0)
         if have < need:
             missing_by_position[pos] = {"need": need, "have": have}
     if missing_by_position:
-        return {
+        return ORJSONResponse({
             "target_gw": target_gw,
             "model_name": model_name,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "filters": {
-                "status": status,
-                "max_cost": max_cost,
-                "min_predicted_points": min_predicted_points,
-                "budget_m": budget_m,
-                "max_per_team": max_per_team,
-                "rules": SQUAD_RULES,
-                "starting_formation": STARTING_FORMATION,
-                "view": view,
-            },
+            "generated_at": generated_at,
+            "filters": filters_block,
             "error": "Not enough candidates to satisfy squad rules under current filters.",
             "diagnostics": {
                 "missing_by_position": missing_by_position,
                 "candidates_count": candidates_count,
             },
-        }
+        })
 
-    # 1) Build starting XI
-    starting_rows, remaining_budget, team_counts, total_have, reasons1 = _pick_starting_xi(
+    # Build starting XI + bench in one bounded pass
+    (
+        starting_rows,
+        bench_rows,
+        remaining_budget2,
+        team_counts,
+        total_have,
+        starting_have_raw,
+        reasons,
+    ) = _build_squad(
         buckets=buckets,
         budget_m=budget_m,
         max_per_team=max_per_team,
         total_required=SQUAD_RULES,
         starting_required=STARTING_FORMATION,
+        n_teams=len(team_ids_by_idx),
+        team_ids_by_idx=team_ids_by_idx,
     )
 
-    # if starting not complete, fail (with helpful diag)
-    starting_have = {p: 0 for p in STARTING_FORMATION}
-    for _, pl, _ in starting_rows:
-        if pl.position in starting_have:
-            starting_have[pl.position] += 1
+    # if starting not complete, fail (with helpful diag); counts come from
+    # the builder's tracked state, not a recount of the picked rows
+    starting_have = {p: starting_have_raw.get(p, 0) for p in STARTING_FORMATION}
     starting_done = all(starting_have[p] >= STARTING_FORMATION[p] for p in STARTING_FORMATION)
     if not starting_done:
-        spent = budget_m - remaining_budget
-        return {
+        spent = budget_m - remaining_budget2
+        return ORJSONResponse({
             "target_gw": target_gw,
             "model_name": model_name,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "filters": {
-                "status": status,
-                "max_cost": max_cost,
-                "min_predicted_points": min_predicted_points,
-                "budget_m": budget_m,
-                "max_per_team": max_per_team,
-                "rules": SQUAD_RULES,
-                "starting_formation": STARTING_FORMATION,
-                "view": view,
-            },
+            "generated_at": generated_at,
+            "filters": filters_block,
             "error": "Failed to build a valid starting XI with current constraints.",
             "diagnostics": {
-                "reasons": reasons1,
+                "reasons": reasons,
                 "starting_have": starting_have,
                 "spent_m": round(spent, 1),
-                "remaining_m": round(remaining_budget, 1),
+                "remaining_m": round(remaining_budget2, 1),
                 "team_counts": {str(k): v for k, v in team_counts.items()},
                 "candidates_count": candidates_count,
             },
-        }
-
-    # 2) Fill bench to complete squad
-    bench_rows, remaining_budget2, reasons2 = _pick_bench(
-        buckets=buckets,
-        already_selected=starting_rows,
-        remaining_budget_m=remaining_budget,
-        team_counts=team_counts,
-        total_have=total_have,
-        total_required=SQUAD_RULES,
-        max_per_team=max_per_team,
-    )
+        })
 
     # Verify full 15-man squad
-    final_rows = starting_rows + bench_rows
-    final_have = {p: 0 for p in SQUAD_RULES}
-    for _, pl, _ in final_rows:
-        if pl.position in final_have:
-            final_have[pl.position] += 1
-
-    squad_done = all(final_have[p] >= SQUAD_RULES[p] for p in SQUAD_RULES) and (len(final_rows) == 15)
+    final_have = {p: total_have.get(p, 0) for p in SQUAD_RULES}
+    squad_done = all(final_have[p] >= SQUAD_RULES[p] for p in SQUAD_RULES) and (
+        len(starting_rows) + len(bench_rows) == 15
+    )
     if not squad_done:
         spent = budget_m - remaining_budget2
-        return {
+        return ORJSONResponse({
             "target_gw": target_gw,
             "model_name": model_name,
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "filters": {
-                "status": status,
-                "max_cost": max_cost,
-                "min_predicted_points": min_predicted_points,
-                "budget_m": budget_m,
-                "max_per_team": max_per_team,
-                "rules": SQUAD_RULES,
-                "starting_formation": STARTING_FORMATION,
-                "view": view,
-            },
+            "generated_at": generated_at,
+            "filters": filters_block,
             "error": "Failed to build a valid squad with current constraints.",
             "diagnostics": {
-                "reasons": reasons1 + reasons2,
+                "reasons": reasons,
                 "have_by_position": final_have,
                 "spent_m": round(spent, 1),
                 "remaining_m": round(remaining_budget2, 1),
@@ -893,7 +1032,7 @@ def recommend_squad(
                 "candidates_count": candidates_count,
                 "hint": "Try relaxing filters (e.g., max_cost, min_predicted_points, or status=all).",
             },
-        }
+        })
 
     # Output serialization
     if view == "compact":
@@ -901,30 +1040,22 @@ def recommend_squad(
     else:
         serialize = _serialize_full
 
-    starting_grouped = _group_by_position(starting_rows)
-    bench_grouped = _group_by_position(bench_rows)
-
     spent = budget_m - remaining_budget2
 
-    # 1) Build payload dicts first (so we can reuse them)
-    starting_payload = {
-        "GKP": [serialize(*r) for r in starting_grouped["GKP"]],
-        "DEF": [serialize(*r) for r in starting_grouped["DEF"]],
-        "MID": [serialize(*r) for r in starting_grouped["MID"]],
-        "FWD": [serialize(*r) for r in starting_grouped["FWD"]],
-    }
+    # 1) Build payload dicts in one pass: each pick is serialized exactly
+    # once and grouped by position directly (no intermediate grouped lists).
+    starting_payload: Dict[Position, list] = {p: [] for p in POSITIONS_TUP}
+    for c in starting_rows:
+        starting_payload[c.position].append(serialize(c))
 
-    bench_payload = {
-        "GKP": [serialize(*r) for r in bench_grouped["GKP"]],
-        "DEF": [serialize(*r) for r in bench_grouped["DEF"]],
-        "MID": [serialize(*r) for r in bench_grouped["MID"]],
-        "FWD": [serialize(*r) for r in bench_grouped["FWD"]],
-    }
+    bench_payload: Dict[Position, list] = {p: [] for p in POSITIONS_TUP}
+    for c in bench_rows:
+        bench_payload[c.position].append(serialize(c))
 
     # 2) Helpers: flatten + bench_list (fixed 4)
     def _flatten_pos_dict(pos_dict: dict) -> list:
         out = []
-        for pos in ["GKP", "DEF", "MID", "FWD"]:
+        for pos in POSITIONS_TUP:
             out.extend(pos_dict.get(pos, []))
         return out
 
@@ -957,30 +1088,16 @@ def recommend_squad(
     starting_flat = _flatten_pos_dict(starting_payload)
 
     def _tag(items: list, role: str) -> list:
-        tagged = []
-        for i, x in enumerate(items, start=1):
-            y = dict(x)  # shallow copy
-            y["role"] = role
-            y["slot"] = i
-            tagged.append(y)
-        return tagged
+        # single dict-unpack per row instead of copy + two item assignments
+        return [{**x, "role": role, "slot": i} for i, x in enumerate(items, start=1)]
 
     squad_list = _tag(starting_flat, "starting") + _tag(bench_list, "bench")
 
-    return {
+    return ORJSONResponse({
         "target_gw": target_gw,
         "model_name": model_name,
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "filters": {
-            "status": status,
-            "max_cost": max_cost,
-            "min_predicted_points": min_predicted_points,
-            "budget_m": budget_m,
-            "max_per_team": max_per_team,
-            "rules": SQUAD_RULES,
-            "starting_formation": STARTING_FORMATION,
-            "view": view,
-        },
+        "generated_at": generated_at,
+        "filters": filters_block,
         "summary": {
             "spent_m": round(spent, 1),
             "remaining_m": round(remaining_budget2, 1),
@@ -993,7 +1110,7 @@ def recommend_squad(
         # ✅ new
         "bench_list": bench_list,   # fixed 4
         "squad_list": squad_list,   # 15 flat
-    }
+    })
 
 
 @router.get("/transfers/self-test")
@@ -1027,7 +1144,7 @@ def recommend_transfers(
     outgoing_candidates = _rank_outgoing_candidates(outgoing_candidates)
 
     if not outgoing_candidates:
-        return {
+        return ORJSONResponse({
             "target_gw": req.target_gw,
             "model_name": req.model_name,
             "bank": req.bank,
@@ -1037,7 +1154,7 @@ def recommend_transfers(
             "selected_outgoing": None,
             "outgoing_candidates": [],
             "rows": [],
-        }
+        })
 
     out = outgoing_candidates[0]
     squad_team_counts = _build_squad_team_counts(outgoing_candidates)
@@ -1115,7 +1232,7 @@ def recommend_transfers(
         reverse=True,
     )[: req.limit]
 
-    return {
+    return ORJSONResponse({
         "target_gw": req.target_gw,
         "model_name": req.model_name,
         "bank": req.bank,
@@ -1126,7 +1243,7 @@ def recommend_transfers(
         "outgoing_candidates": outgoing_candidates,
         "squad_team_counts": squad_team_counts,
         "rows": rows,
-    }
+    })
 
 @router.get("/captain")
 def recommend_captain(
@@ -1192,10 +1309,10 @@ def recommend_captain(
     captain = top_candidates[0] if len(top_candidates) >= 1 else None
     vice_captain = top_candidates[1] if len(top_candidates) >= 2 else None
 
-    return {
+    return ORJSONResponse({
         "target_gw": target_gw,
         "model_name": model_name,
         "captain": captain,
         "vice_captain": vice_captain,
         "top_candidates": top_candidates,
-    }
\ No newline at end of file
+    })
\ No newline at end of file
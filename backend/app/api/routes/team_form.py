@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, desc
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
 from app.core.db import get_db
 from app.models.fixture import Fixture
 from app.models.team import Team
+from app.utils.fpl_dates import as_utc
 
 router = APIRouter(prefix="/teams", tags=["match"])
 
@@ -14,8 +15,12 @@ router = APIRouter(prefix="/teams", tags=["match"])
 def parse_before(before: Optional[str]) -> Optional[datetime]:
     if not before:
         return None
-    # accepts ISO8601 like "2026-03-14T17:30:00+00:00"
-    return datetime.fromisoformat(before.replace("Z", "+00:00"))
+    # accepts ISO8601 like "2026-03-14T17:30:00+00:00"; normalise to the
+    # naive-UTC form stored in kickoff_time before comparing
+    dt = datetime.fromisoformat(before.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
 
 
 @router.get("/{team_id}/form")
@@ -95,7 +100,7 @@ def team_form(
             {
                 "fixture_id": f.id,
                 "gw": getattr(f, "gw", None),
-                "kickoff_time": f.kickoff_time.isoformat() if f.kickoff_time else None,
+                "kickoff_time": as_utc(f.kickoff_time).isoformat() if f.kickoff_time else None,
                 "opponent_team_id": opp_id,
                 "goals_for": goals_for,
                 "goals_against": goals_against,
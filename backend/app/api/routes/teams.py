@@ -1,16 +1,46 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+import time
+from typing import Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_db
 from app.models.team import Team
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
+# Response cache: the team list changes a few times per season yet is hit on
+# every page load. The TTL is a safety net; the bootstrap ingest invalidates
+# explicitly, so warm reads never touch the DB. The route takes no query
+# params, so a single cached payload covers it. The body is cached as
+# rendered orjson bytes, so warm hits do no per-row dict building or
+# serialization at all.
+TEAMS_CACHE_TTL_SECONDS = 3600.0
+_TEAMS_CACHE: Optional[Tuple[float, bytes]] = None  # (cached_at, body)
+
+
+def invalidate_teams_cache() -> None:
+    """Drop the cached /teams payload (called after team ingests)."""
+    global _TEAMS_CACHE
+    _TEAMS_CACHE = None
+
+
 @router.get("")
-def list_teams(db: Session = Depends(get_db)):
-    teams = db.query(Team).all()
-    return {
-        "teams": [
-            {"id": t.id, "fpl_team_id": t.fpl_team_id, "name": t.name, "short_name": t.short_name}
-            for t in teams
-        ]
-    }
+async def list_teams(db: AsyncSession = Depends(get_async_db)):
+    global _TEAMS_CACHE
+    cached = _TEAMS_CACHE
+    if cached is not None and time.monotonic() - cached[0] < TEAMS_CACHE_TTL_SECONDS:
+        return Response(content=cached[1], media_type="application/json")
+
+    # async session (asyncpg driver): the event loop stays free during the
+    # DB wait instead of parking the request on a threadpool worker.
+    # Column projection: the payload only needs four fields, so skip full
+    # ORM hydration (identity map, attribute instrumentation) and serialize
+    # plain Row tuples.
+    rows = (
+        await db.execute(select(Team.id, Team.fpl_team_id, Team.name, Team.short_name))
+    ).all()
+    body = orjson.dumps({"teams": [r._asdict() for r in rows]})
+    _TEAMS_CACHE = (time.monotonic(), body)
+    return Response(content=body, media_type="application/json")
@@ -1,9 +1,55 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# Pool sized for concurrent API workers: the default (pool_size=5,
+# max_overflow=10) makes requests queue for connections under load. LIFO reuse
+# keeps the hottest connection (and its caches) busy, and recycle guards
+# against the DB or a proxy silently dropping idle connections.
+engine = create_engine(
+    settings.database_url,
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_timeout=5,
+    pool_use_lifo=True,
+    # Batch executemany flushes (e.g. bulk_update_mappings in the gameweeks
+    # ingest) into few round trips instead of one statement per row.
+    executemany_mode="values_plus_batch",
+    # Bound how long any connection can be wedged: runaway statements die at
+    # 5s instead of holding a pooled connection, and TCP keepalives surface
+    # dead peers (dropped NAT/LB flows) instead of hanging reads forever.
+    connect_args={
+        "options": "-c statement_timeout=5000",
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 3,
+    },
+)
+
+# autoflush stays off: the ingest routes interleave SELECTs (preloads, id
+# maps) with large batches of pending writes, and an autoflushing session
+# would re-emit the pending SQL before every one of those queries.
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+# Async engine for routes converted to async def: frees the event loop during
+# DB waits instead of tying up a threadpool worker per request. Shares the
+# database but uses the asyncpg driver.
+async_engine = create_async_engine(
+    settings.database_url.replace("postgresql://", "postgresql+asyncpg://", 1),
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_timeout=5,
+    # Same statement bound as the sync engine (asyncpg takes it as a server
+    # setting rather than libpq options).
+    connect_args={"server_settings": {"statement_timeout": "5000"}},
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 class Base(DeclarativeBase):
     pass
@@ -14,3 +60,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,4 +1,8 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app.services.fpl_client import aclose_async_client
 from app.api.routes.health import router as health_router
 from app.api.routes.db_ping import router as db_ping_router
 from app.api.routes.teams import router as teams_router
@@ -18,7 +22,17 @@ from app.api.routes import chips
 from app.api.routes import decision_runs
 
 
-app = FastAPI(title="EPL/FPL Predictor")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await aclose_async_client()
+
+
+app = FastAPI(
+    title="EPL/FPL Predictor",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.include_router(health_router)
 app.include_router(db_ping_router)
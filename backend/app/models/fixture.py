@@ -19,8 +19,9 @@ class Fixture(Base):
 
     gw = Column(Integer, nullable=True, index=True)
 
-    # Kickoff time in UTC (from FPL)
-    kickoff_time: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Kickoff time from FPL; stored naive with an always-UTC invariant so
+    # the driver skips per-value tz conversion (see utils.fpl_dates.as_utc)
+    kickoff_time: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=False), nullable=True)
 
     # Status
     finished: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
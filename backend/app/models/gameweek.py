@@ -1,24 +1,64 @@
+from enum import IntEnum
 from typing import Optional
-from sqlalchemy import Integer, Boolean, DateTime
+from sqlalchemy import Index, Integer, SmallInteger, DateTime, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
 
+
+class GwStatus(IntEnum):
+    """Single lifecycle column replacing the is_current/is_next/is_finished
+    bool triple (and their three indexes). CURRENT_FINISHED captures the FPL
+    boundary state where the current GW has finished but the next deadline
+    has not passed, so no flag combination that occurs in practice is lost.
+    """
+
+    FUTURE = 0
+    NEXT = 1
+    CURRENT = 2
+    CURRENT_FINISHED = 3
+    FINISHED = 4
+
+    @classmethod
+    def from_flags(cls, *, is_current: bool, is_next: bool, is_finished: bool) -> "GwStatus":
+        if is_next:
+            return cls.NEXT
+        if is_current:
+            return cls.CURRENT_FINISHED if is_finished else cls.CURRENT
+        if is_finished:
+            return cls.FINISHED
+        return cls.FUTURE
+
+
+# Statuses matching the old is_current / is_finished semantics.
+CURRENT_STATUSES = (GwStatus.CURRENT, GwStatus.CURRENT_FINISHED)
+FINISHED_STATUSES = (GwStatus.CURRENT_FINISHED, GwStatus.FINISHED)
+
+
 class Gameweek(Base):
     __tablename__ = "gameweeks"
+    __table_args__ = (
+        # Only the handful of active rows are ever looked up by status; a
+        # partial index keeps that lookup tiny without indexing the bulk of
+        # finished/future rows.
+        Index(
+            "ix_gameweeks_status_active",
+            "status",
+            postgresql_where=text("status IN (1, 2, 3)"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     # FPL event id (gameweek number)
     gw: Mapped[int] = mapped_column(Integer, unique=True, index=True)
 
-    # deadline_time from FPL (UTC)
-    deadline_time: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # deadline_time from FPL; stored naive with an always-UTC invariant so
+    # the driver skips per-value tz conversion (see utils.fpl_dates.as_utc)
+    deadline_time: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=False), nullable=True)
 
-    # status flags from FPL
-    is_current: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
-    is_next: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
-    is_finished: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    # lifecycle status derived from the FPL flags (see GwStatus)
+    status: Mapped[int] = mapped_column(SmallInteger, default=int(GwStatus.FUTURE))
 
     # Optional: useful to store
-    name: Mapped[Optional[str]] = mapped_column(nullable=True)
\ No newline at end of file
+    name: Mapped[Optional[str]] = mapped_column(nullable=True)
@@ -1,7 +1,33 @@
-from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy import String, Integer, SmallInteger, ForeignKey, TypeDecorator
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.db import Base
 
+# Position is stored as a 1-byte-comparable SMALLINT (4x smaller index,
+# integer comparisons in filters and hash joins) while the whole app keeps
+# speaking GKP/DEF/MID/FWD: the TypeDecorator maps on bind and on result, so
+# queries, payloads and the ingest mapping are untouched.
+_POSITION_CODES = {"UNK": 0, "GKP": 1, "DEF": 2, "MID": 3, "FWD": 4}
+_POSITION_NAMES = {v: k for k, v in _POSITION_CODES.items()}
+
+
+class PositionType(TypeDecorator):
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # Unknown labels (e.g. a free-form ?position= query param) bind to a
+        # never-stored sentinel so filters match nothing, as the string
+        # column did, instead of raising during statement compilation.
+        return _POSITION_CODES.get(value, -1)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return _POSITION_NAMES[value]
+
+
 class Player(Base):
     __tablename__ = "players"
 
@@ -17,8 +43,8 @@ class Player(Base):
     # Link to teams table
     team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"), index=True)
 
-    # GKP, DEF, MID, FWD
-    position: Mapped[str] = mapped_column(String(3), index=True)
+    # GKP, DEF, MID, FWD (SMALLINT in the DB; see PositionType)
+    position: Mapped[str] = mapped_column(PositionType, index=True)
 
     # FPL uses integer cose = price * 10 (e.g. 75 => 7.5)
     now_cost: Mapped[int] = mapped_column(Integer)
@@ -26,5 +52,8 @@ class Player(Base):
     # availability status (e.g. "a" available, "i" injured)
     status: Mapped[str] = mapped_column(String(1), index=True)
 
-    team = relationship("Team")
+    # Many-to-one with the FK on this side: a joined eager load resolves it
+    # in the initial SELECT, so iterating players and reading .team never
+    # fires per-row queries (N+1).
+    team = relationship("Team", lazy="joined", innerjoin=True, back_populates="players")
 
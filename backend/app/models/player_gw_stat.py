@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Index, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -22,9 +22,20 @@ class PlayerGameweekStat(Base):
     clean_sheets: Mapped[int] = mapped_column(Integer, default=0)
     total_points: Mapped[int] = mapped_column(Integer, default=0)
 
-    # ORM convenience
-    player = relationship("Player")
+    # ORM convenience; raise_on_sql so an accidental per-row lazy load in a
+    # stats loop fails fast instead of silently becoming an N+1 — opt in
+    # with selectinload where the relationship is genuinely needed.
+    player = relationship("Player", lazy="raise_on_sql")
 
     __table_args__ = (
         UniqueConstraint("player_id", "gw", name="uq_player_gw_stats_player_id_gw"),
+        # Covering index for the MAE evaluation join on (player_id, gw):
+        # total_points rides along as INCLUDE payload, making the stats side
+        # an index-only scan.
+        Index(
+            "ix_pgs_player_gw_inc_points",
+            "player_id",
+            "gw",
+            postgresql_include=["total_points"],
+        ),
     )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, func, UniqueConstraint
+from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Index, func, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
@@ -9,6 +9,18 @@ class Prediction(Base):
     __tablename__ = "predictions"
     __table_args__ = (
         UniqueConstraint("player_id", "target_gw", "model_name", name="uq_predictions_player_gw_model"),
+        # Covers the (target_gw, model_name) filter with the join key in the
+        # index, so the candidates query can resolve predictions rows with an
+        # index-only scan before joining players/teams. predicted_points is
+        # carried as an INCLUDE payload so the MAE evaluation join never
+        # touches the heap either.
+        Index(
+            "ix_pred_gw_model_player",
+            "target_gw",
+            "model_name",
+            "player_id",
+            postgresql_include=["predicted_points"],
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -1,5 +1,5 @@
 from sqlalchemy import String, Integer
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.db import Base
 
 class Team(Base):
@@ -9,3 +9,7 @@ class Team(Base):
     fpl_team_id: Mapped[int] = mapped_column(Integer, unique=True, index=True)
     name: Mapped[str] = mapped_column(String(100))
     short_name: Mapped[str] = mapped_column(String(10))
+
+    # Reverse side loads a whole roster; raise instead of silently firing a
+    # lazy SELECT so accidental N+1s fail fast. Opt in with selectinload.
+    players = relationship("Player", back_populates="team", lazy="raise")
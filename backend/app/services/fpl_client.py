@@ -1,10 +1,88 @@
+import atexit
+import time
+from typing import Any, Dict, Optional, Tuple
+
 import httpx
+import orjson
 
 BOOTSTRAP_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
 
+# Short-TTL cache for FPL JSON payloads, keyed by URL. Within the TTL we skip
+# the network entirely; after it we revalidate with If-None-Match so an
+# unchanged payload costs a 304 instead of a full re-download.
+CACHE_TTL_SECONDS = 60.0
+_JSON_CACHE: Dict[str, Tuple[float, Optional[str], Any]] = {}  # url -> (fetched_at, etag, payload)
+
+# Shared async client for ingest endpoints: keep-alive + HTTP/2 so repeated
+# FPL calls reuse one TCP/TLS session. Closed via the FastAPI lifespan hook.
+ASYNC_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+
+async def aclose_async_client() -> None:
+    """Close the shared async client (called on app shutdown)."""
+    await ASYNC_CLIENT.aclose()
+
+
+# Shared sync client for the remaining sync ingest path: reusing one TCP/TLS
+# session amortizes the handshake (~2 RTTs) across bootstrap fetches instead
+# of paying it on every call.
+SYNC_CLIENT = httpx.Client(
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+atexit.register(SYNC_CLIENT.close)
+
+
+async def fetch_json(url: str) -> Any:
+    """Fetch JSON from an FPL endpoint through the TTL/ETag cache."""
+    now = time.monotonic()
+    cached = _JSON_CACHE.get(url)
+    if cached is not None and now - cached[0] < CACHE_TTL_SECONDS:
+        return cached[2]
+
+    headers = {}
+    if cached is not None and cached[1]:
+        headers["If-None-Match"] = cached[1]
+
+    resp = await ASYNC_CLIENT.get(url, headers=headers)
+    if resp.status_code == 304 and cached is not None:
+        _JSON_CACHE[url] = (now, cached[1], cached[2])
+        return cached[2]
+
+    resp.raise_for_status()
+    # orjson: C parser, noticeably faster than stdlib json on the MB-scale
+    # FPL payloads
+    payload = orjson.loads(resp.content)
+    _JSON_CACHE[url] = (now, resp.headers.get("etag"), payload)
+    return payload
+
 def fetch_bootstrap() -> dict:
-    """Fetch FPL bootstrap-static JSON."""
-    with httpx.Client(timeout=30) as client:
-        r = client.get(BOOTSTRAP_URL)
-        r.raise_for_status()
-        return r.json()
\ No newline at end of file
+    """Fetch FPL bootstrap-static JSON through the TTL/ETag cache.
+
+    Sync counterpart of fetch_json: within the TTL the ~1MB payload is
+    returned straight from memory; afterwards an If-None-Match revalidation
+    turns an unchanged payload into a bodyless 304, skipping both the
+    download and the JSON decode.
+    """
+    now = time.monotonic()
+    cached = _JSON_CACHE.get(BOOTSTRAP_URL)
+    if cached is not None and now - cached[0] < CACHE_TTL_SECONDS:
+        return cached[2]
+
+    headers = {}
+    if cached is not None and cached[1]:
+        headers["If-None-Match"] = cached[1]
+
+    r = SYNC_CLIENT.get(BOOTSTRAP_URL, headers=headers)
+    if r.status_code == 304 and cached is not None:
+        _JSON_CACHE[BOOTSTRAP_URL] = (now, cached[1], cached[2])
+        return cached[2]
+    r.raise_for_status()
+    payload = orjson.loads(r.content)
+    _JSON_CACHE[BOOTSTRAP_URL] = (now, r.headers.get("etag"), payload)
+    return payload
\ No newline at end of file
@@ -0,0 +1,58 @@
+from typing import List, Tuple
+
+from app.core.db import async_engine
+
+# Stage-table column order; must match the record tuples handed to COPY.
+GW_STAT_COLUMNS = (
+    "player_id",
+    "gw",
+    "minutes",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "total_points",
+)
+
+_MERGE_SQL = """
+INSERT INTO player_gw_stats
+    (player_id, gw, minutes, goals_scored, assists, clean_sheets, total_points)
+SELECT player_id, gw, minutes, goals_scored, assists, clean_sheets, total_points
+FROM _gw_stats_stage
+ON CONFLICT (player_id, gw) DO UPDATE SET
+    minutes = excluded.minutes,
+    goals_scored = excluded.goals_scored,
+    assists = excluded.assists,
+    clean_sheets = excluded.clean_sheets,
+    total_points = excluded.total_points
+RETURNING (xmax = 0) AS inserted
+"""
+
+
+async def bulk_upsert_gw_stats(records: List[tuple]) -> Tuple[int, int]:
+    """Bulk-upsert player_gw_stats rows via COPY into a temp stage table.
+
+    COPY streams the rows in Postgres binary protocol (no per-row
+    parse/plan), then one INSERT ... ON CONFLICT merges the stage into the
+    real table using the (player_id, gw) unique constraint. Returns
+    (inserted, updated) counts classified by xmax, matching the old
+    VALUES-upsert accounting.
+    """
+    if not records:
+        return 0, 0
+
+    async with async_engine.begin() as conn:
+        raw = await conn.get_raw_connection()
+        apg = raw.driver_connection  # asyncpg connection
+        await apg.execute(
+            "CREATE TEMP TABLE _gw_stats_stage ("
+            " player_id INTEGER, gw INTEGER, minutes INTEGER,"
+            " goals_scored INTEGER, assists INTEGER, clean_sheets INTEGER,"
+            " total_points INTEGER"
+            ") ON COMMIT DROP"
+        )
+        await apg.copy_records_to_table(
+            "_gw_stats_stage", records=records, columns=list(GW_STAT_COLUMNS)
+        )
+        flags = await apg.fetch(_MERGE_SQL)
+        inserted = sum(1 for r in flags if r["inserted"])
+        return inserted, len(flags) - inserted
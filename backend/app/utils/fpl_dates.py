@@ -0,0 +1,39 @@
+from typing import Optional
+from datetime import datetime, timezone
+
+
+def parse_dt(s: Optional[str]) -> Optional[datetime]:
+    """Parse an FPL timestamp like "2025-08-15T17:30:00Z" into a naive UTC
+    datetime.
+
+    Stored timestamps follow the app invariant "always UTC, stored naive"
+    (TIMESTAMP WITHOUT TIME ZONE): the driver then decodes plain datetimes
+    with no per-value tz conversion, and as_utc() re-tags them at read
+    boundaries. FPL timestamps are fixed-format UTC strings, so the fast
+    path slices the digits directly instead of normalising the "Z" suffix
+    and going through datetime.fromisoformat for every row. Anything that
+    doesn't match the expected shape falls back to fromisoformat.
+    """
+    if not s:
+        return None
+    if len(s) == 20 and s.endswith("Z"):
+        try:
+            return datetime(
+                int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                int(s[11:13]), int(s[14:16]), int(s[17:19]),
+            )
+        except ValueError:
+            pass
+    if s.endswith("Z"):
+        s = s.replace("Z", "+00:00")
+    dt = datetime.fromisoformat(s)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """Tag a stored naive-UTC datetime as timezone-aware UTC (read boundary)."""
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=timezone.utc)
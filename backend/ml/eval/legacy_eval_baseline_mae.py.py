@@ -4,50 +4,16 @@ from __future__ import annotations
 import sys
 from typing import Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.orm import Session
 
 # Project models
 from app.models.prediction import Prediction
 from app.models.player_gw_stat import PlayerGameweekStat
 
-# Try to import DB session from common project patterns.
-# (Keeps this script reusable even if your db module naming differs.)
-SessionLocal = None
-_engine = None
-
-try:
-    # common pattern 1
-    from app.core.db import SessionLocal as _SessionLocal  # type: ignore
-    SessionLocal = _SessionLocal
-except Exception:
-    pass
-
-if SessionLocal is None:
-    try:
-        # common pattern 2
-        from app.core.db import get_db as _get_db  # type: ignore
-
-        def _sessionlocal_from_get_db():
-            gen = _get_db()
-            s = next(gen)
-            return s, gen
-
-    except Exception:
-        _sessionlocal_from_get_db = None  # type: ignore
-else:
-    _sessionlocal_from_get_db = None  # type: ignore
-
-if SessionLocal is None and _sessionlocal_from_get_db is None:
-    try:
-        # common pattern 3
-        from app.core.db import engine as _eng  # type: ignore
-        from sqlalchemy.orm import sessionmaker
-
-        _engine = _eng
-        SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False)
-    except Exception:
-        pass
+# Canonical session factory: shares the app engine and its configured pool
+# instead of building an ad-hoc unpooled fallback.
+from app.core.db import SessionLocal
 
 
 def parse_int_arg(name: str, default: Optional[int] = None) -> Optional[int]:
@@ -84,26 +50,8 @@ def open_session():
     """
     Returns (session, cleanup_fn)
     """
-    if SessionLocal is not None:
-        s = SessionLocal()
-        return s, lambda: s.close()
-
-    if _sessionlocal_from_get_db is not None:
-        s, gen = _sessionlocal_from_get_db()
-        def _cleanup():
-            try:
-                s.close()
-            except Exception:
-                pass
-            try:
-                gen.close()
-            except Exception:
-                pass
-        return s, _cleanup
-
-    raise RuntimeError(
-        "Could not create DB session. Please check app.core.db and expose SessionLocal (or engine/get_db)."
-    )
+    s = SessionLocal()
+    return s, lambda: s.close()
 
 
 def main() -> None:
@@ -126,31 +74,16 @@ def run_eval(session: Session, model_name: str, min_gw: Optional[int], max_gw: O
     on (player_id, target_gw == gw)
     """
 
-    # Base filters
-    filters = [Prediction.model_name == model_name]
-
-    if min_gw is not None:
-        filters.append(Prediction.target_gw >= min_gw)
-    if max_gw is not None:
-        filters.append(Prediction.target_gw <= max_gw)
-
-    # ---- 1) Count matched rows
-    matched_count_stmt = (
-        select(func.count())
-        .select_from(Prediction)
-        .join(
-            PlayerGameweekStat,
-            (Prediction.player_id == PlayerGameweekStat.player_id)
-            & (Prediction.target_gw == PlayerGameweekStat.gw),
-        )
-        .where(*filters)
-    )
-    matched_rows = session.execute(matched_count_stmt).scalar_one()
-
-    # ---- 2) Per-GW MAE
-    # MAE = avg(abs(predicted_points - total_points))
-    per_gw_stmt = (
-        select(
+    # One ROLLUP query replaces the previous three (matched count, per-GW
+    # MAE, overall MAE): the join is scanned once and the round-trips drop
+    # from 3 to 1. The NULL-gw row of the rollup is the overall aggregate,
+    # and its count doubles as the matched-rows figure.
+    #
+    # lambda_stmt: batch evals call this across many model/GW ranges; the
+    # statement is constructed and compiled once per filter shape and only
+    # the bound parameters change between runs.
+    rollup_stmt = lambda_stmt(
+        lambda: select(
             Prediction.target_gw.label("gw"),
             func.count().label("n"),
             func.avg(func.abs(Prediction.predicted_points - PlayerGameweekStat.total_points)).label("mae"),
@@ -161,29 +94,26 @@ def run_eval(session: Session, model_name: str, min_gw: Optional[int], max_gw: O
             (Prediction.player_id == PlayerGameweekStat.player_id)
             & (Prediction.target_gw == PlayerGameweekStat.gw),
         )
-        .where(*filters)
-        .group_by(Prediction.target_gw)
-        .order_by(Prediction.target_gw.asc())
+        .where(Prediction.model_name == model_name)
+        .group_by(func.rollup(Prediction.target_gw))
+        .order_by(Prediction.target_gw.asc().nulls_last())
     )
-    per_gw_rows = session.execute(per_gw_stmt).all()
+    if min_gw is not None:
+        rollup_stmt += lambda s: s.where(Prediction.target_gw >= min_gw)
+    if max_gw is not None:
+        rollup_stmt += lambda s: s.where(Prediction.target_gw <= max_gw)
 
-    # ---- 3) Overall MAE
-    overall_stmt = (
-        select(
-            func.count().label("n"),
-            func.avg(func.abs(Prediction.predicted_points - PlayerGameweekStat.total_points)).label("mae"),
-        )
-        .select_from(Prediction)
-        .join(
-            PlayerGameweekStat,
-            (Prediction.player_id == PlayerGameweekStat.player_id)
-            & (Prediction.target_gw == PlayerGameweekStat.gw),
-        )
-        .where(*filters)
+    rows = session.execute(rollup_stmt).all()
+
+    per_gw_rows = [r for r in rows if r.gw is not None]
+    overall_row = next((r for r in rows if r.gw is None), None)
+    overall_n = int(overall_row.n or 0) if overall_row is not None else 0
+    overall_mae = (
+        float(overall_row.mae)
+        if overall_row is not None and overall_row.mae is not None
+        else None
     )
-    overall_row = session.execute(overall_stmt).one()
-    overall_n = int(overall_row.n or 0)
-    overall_mae = float(overall_row.mae) if overall_row.mae is not None else None
+    matched_rows = overall_n
 
     # ---- Output (plain text, easy to copy into docs)
     print("=" * 72)